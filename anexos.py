@@ -0,0 +1,164 @@
+# =============================================================================
+# DOCUMENTOS DIGITALIZADOS DOS ALUNOS (identidade, CPF, residência, vacina e foto 3x4)
+# =============================================================================
+# Uso: python anexos.py --codigo 12 --tipo doc_foto foto.jpg [--banco cadastros.db]
+#      python anexos.py --codigo 12                       (lista os documentos do aluno)
+#
+# Os arquivos ficam na pasta 'anexos' ao lado do banco (ou na variável CADASTROS_ANEXOS), com o
+# SHA-256 do conteúdo como nome: o mesmo arquivo anexado duas vezes é gravado uma única vez.
+#   anexos/objetos/ab/ab12...ef.jpg           arquivo original
+#   anexos/miniaturas/tela/ab/ab12...ef.png   miniaturas geradas sob demanda, em tamanhos fixos
+# A tabela 'anexos' (banco_dados.criar_anexos) liga cada arquivo ao código do aluno.
+import argparse
+import hashlib
+import os
+import shutil
+import sys
+import tempfile
+from datetime import datetime
+
+import banco_dados
+
+# Tipos de documento: as mesmas colunas de "Documentos Entregues"
+TIPOS = {'doc_id': "Identidade", 'doc_cpf': "CPF", 'doc_residencia': "Residência", 'doc_vacina': "Vacina", 'doc_foto': "Foto 3x4"}
+# Miniaturas: nome -> (largura, altura, formato, recortar em 3x4). 'ficha' tem ~300 dpi nos 2,4 x 3,2 cm da foto na ficha.
+MINIATURAS = {'icone': (45, 60, 'PNG', True), 'tela': (120, 160, 'PNG', False), 'ficha': (300, 400, 'JPEG', True)}
+# Extensões que o Pillow abre; PDFs e outros documentos não têm miniatura
+EXTENSOES_IMAGEM = {'.jpg', '.jpeg', '.png', '.gif', '.bmp', '.tif', '.tiff', '.webp'}
+# Bytes lidos por vez ao calcular o hash e copiar o arquivo
+TAMANHO_BLOCO = 1024 * 1024
+
+def pasta_anexos(conn):
+    """Pasta dos arquivos do banco aberto em 'conn': 'anexos' ao lado do arquivo do banco."""
+    caminho_banco = conn.execute("PRAGMA database_list").fetchone()[2]
+    return os.environ.get('CADASTROS_ANEXOS') or os.path.join(os.path.dirname(os.path.abspath(caminho_banco or banco_dados.CAMINHO_PADRAO)), 'anexos')
+
+def caminho_objeto(pasta, anexo):
+    return os.path.join(pasta, 'objetos', anexo['hash'][:2], anexo['hash'] + anexo['extensao'])
+
+def caminho_miniatura(pasta, anexo, tamanho):
+    extensao = '.jpg' if MINIATURAS[tamanho][2] == 'JPEG' else '.png'
+    return os.path.join(pasta, 'miniaturas', tamanho, anexo['hash'][:2], anexo['hash'] + extensao)
+
+def _gravar_atomico(destino, escrever):
+    # Grava num temporário da mesma pasta e renomeia: um arquivo pela metade nunca aparece com o nome final
+    os.makedirs(os.path.dirname(destino), exist_ok=True)
+    descritor, temporario = tempfile.mkstemp(dir=os.path.dirname(destino), suffix='.tmp')
+    try:
+        with os.fdopen(descritor, 'wb') as arquivo: escrever(arquivo)
+        os.replace(temporario, destino)
+    except BaseException:
+        os.unlink(temporario); raise
+
+def guardar_arquivo(pasta, origem):
+    """Copia o arquivo para o depósito (se ainda não estiver lá) e devolve hash, extensão, tamanho e nome original."""
+    sha = hashlib.sha256(); tamanho = 0
+    with open(origem, 'rb') as arquivo:
+        for bloco in iter(lambda: arquivo.read(TAMANHO_BLOCO), b''): sha.update(bloco); tamanho += len(bloco)
+    anexo = {'hash': sha.hexdigest(), 'extensao': os.path.splitext(origem)[1].lower(), 'tamanho': tamanho, 'nome_original': os.path.basename(origem)}
+    destino = caminho_objeto(pasta, anexo)
+    if not os.path.exists(destino):
+        with open(origem, 'rb') as arquivo: _gravar_atomico(destino, lambda saida: shutil.copyfileobj(arquivo, saida, TAMANHO_BLOCO))
+    return anexo
+
+def miniatura(pasta, anexo, tamanho='tela'):
+    """Caminho da miniatura do anexo no tamanho pedido, gerada na primeira vez; None se não for uma imagem.
+
+    Decodificar uma digitalização grande é lento: chame fora da thread da interface.
+    """
+    if anexo['extensao'] not in EXTENSOES_IMAGEM: return None
+    destino = caminho_miniatura(pasta, anexo, tamanho)
+    if os.path.exists(destino): return destino
+    try: from PIL import Image, ImageOps, UnidentifiedImageError
+    except ImportError: raise RuntimeError("Para gerar miniaturas instale o pacote 'pillow' (pip install pillow).")
+    largura, altura, formato, recortar = MINIATURAS[tamanho]
+    try:
+        with Image.open(caminho_objeto(pasta, anexo)) as imagem:
+            # draft() decodifica JPEGs já reduzidos, bem mais rápido que abrir a foto inteira da câmera
+            imagem.draft('RGB', (largura * 2, altura * 2))
+            imagem = ImageOps.exif_transpose(imagem).convert('RGB')
+            if recortar: imagem = ImageOps.fit(imagem, (largura, altura), Image.LANCZOS)
+            else: imagem.thumbnail((largura, altura), Image.LANCZOS)
+    except UnidentifiedImageError: return None
+    _gravar_atomico(destino, lambda saida: imagem.save(saida, formato, **({'quality': 85} if formato == 'JPEG' else {})))
+    return destino
+
+def miniatura_da_ficha(pasta, foto):
+    """Miniatura 'ficha' da foto 3x4, ou None se não houver foto ou ela não puder ser lida (a ficha sai sem foto)."""
+    if foto is None: return None
+    try: return miniatura(pasta, foto, 'ficha')
+    except RuntimeError: raise
+    # Foto corrompida (OSError) ou grande demais (DecompressionBombError)
+    except Exception: return None
+
+def preparar_miniaturas(pasta, anexo):
+    # Gera de uma vez todos os tamanhos, logo depois de anexar, para a tela e a ficha já os encontrarem prontos
+    return {tamanho: miniatura(pasta, anexo, tamanho) for tamanho in MINIATURAS}
+
+def registrar_anexo(conn, codigo, tipo, anexo):
+    """Liga o arquivo guardado ao aluno; o mesmo arquivo no mesmo tipo não é repetido. Devolve o id."""
+    if tipo not in TIPOS: raise ValueError(f"Tipo de documento inválido: '{tipo}'.")
+    conn.execute("INSERT INTO anexos (codigo, tipo, hash, extensao, nome_original, tamanho, data_envio) VALUES (?, ?, ?, ?, ?, ?, ?) ON CONFLICT (codigo, tipo, hash) DO NOTHING",
+                 (codigo, tipo, anexo['hash'], anexo['extensao'], anexo.get('nome_original'), anexo.get('tamanho'), datetime.now().isoformat(timespec='seconds')))
+    conn.commit()
+    return conn.execute("SELECT id FROM anexos WHERE codigo = ? AND tipo = ? AND hash = ?", (codigo, tipo, anexo['hash'])).fetchone()[0]
+
+def anexar(conn, codigo, tipo, origem):
+    anexo = guardar_arquivo(pasta_anexos(conn), origem)
+    return registrar_anexo(conn, codigo, tipo, anexo)
+
+def listar_anexos(conn, codigo, tipo=None):
+    """Anexos do aluno (dicts), do mais recente para o mais antigo."""
+    filtro, parametros = ("AND tipo = ?", (codigo, tipo)) if tipo else ("", (codigo,))
+    cursor = conn.execute(f"SELECT id, codigo, tipo, hash, extensao, nome_original, tamanho, data_envio FROM anexos WHERE codigo = ? {filtro} ORDER BY id DESC", parametros)
+    nomes_colunas = [d[0] for d in cursor.description]
+    return [dict(zip(nomes_colunas, linha)) for linha in cursor]
+
+def foto_3x4(conn, codigo):
+    """Foto 3x4 mais recente do aluno (dict do anexo), ou None."""
+    fotos = listar_anexos(conn, codigo, 'doc_foto')
+    return fotos[0] if fotos else None
+
+def remover_anexo(conn, pasta, id_anexo):
+    """Desliga o anexo do aluno; o arquivo e as miniaturas só são apagados se nenhum outro anexo usar o mesmo conteúdo."""
+    linha = conn.execute("SELECT hash, extensao FROM anexos WHERE id = ?", (id_anexo,)).fetchone()
+    if linha is None: return
+    conn.execute("DELETE FROM anexos WHERE id = ?", (id_anexo,)); conn.commit()
+    anexo = {'hash': linha[0], 'extensao': linha[1]}
+    # O arquivo original tem a extensão no nome; as miniaturas só o hash, e servem a qualquer extensão
+    caminhos = []
+    if not conn.execute("SELECT 1 FROM anexos WHERE hash = ? AND extensao = ? LIMIT 1", (anexo['hash'], anexo['extensao'])).fetchone():
+        caminhos.append(caminho_objeto(pasta, anexo))
+    if not conn.execute("SELECT 1 FROM anexos WHERE hash = ? LIMIT 1", (anexo['hash'],)).fetchone():
+        caminhos += [caminho_miniatura(pasta, anexo, tamanho) for tamanho in MINIATURAS]
+    for caminho in caminhos:
+        try: os.remove(caminho)
+        except FileNotFoundError: pass
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Anexa documentos digitalizados a um aluno ou lista os já anexados.")
+    parser.add_argument('arquivos', nargs='*', help="arquivos a anexar (sem arquivos, lista os anexos do aluno)")
+    parser.add_argument('--banco', default=banco_dados.CAMINHO_PADRAO, help="arquivo do banco SQLite")
+    parser.add_argument('--codigo', type=int, required=True, help="código do aluno")
+    parser.add_argument('--tipo', choices=list(TIPOS), help="tipo do documento (obrigatório ao anexar)")
+    args = parser.parse_args(argv)
+    if args.arquivos and not args.tipo: parser.error("informe --tipo ao anexar arquivos")
+
+    conn = banco_dados.conectar(args.banco)
+    try:
+        if banco_dados.buscar_aluno(conn, args.codigo) is None: print(f"Nenhum aluno encontrado com o código {args.codigo}.", file=sys.stderr); return 1
+        pasta = pasta_anexos(conn)
+        for origem in args.arquivos:
+            anexo = guardar_arquivo(pasta, origem); registrar_anexo(conn, args.codigo, args.tipo, anexo)
+            # Uma imagem corrompida (OSError, DecompressionBombError) não impede o anexo, só fica sem miniatura
+            try: preparar_miniaturas(pasta, anexo)
+            except Exception as e: print(f"{origem}: sem miniatura ({e})", file=sys.stderr)
+            print(f"{origem}: anexado como {TIPOS[args.tipo]} ({anexo['hash'][:12]})")
+        if not args.arquivos:
+            for anexo in listar_anexos(conn, args.codigo):
+                print(f"{anexo['id']:6} {TIPOS.get(anexo['tipo'], anexo['tipo']):12} {anexo['data_envio']}  {anexo['nome_original']}  {caminho_objeto(pasta, anexo)}")
+    finally: conn.close()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,394 @@
+# =============================================================================
+# ACESSO AO BANCO DE DADOS DE ALUNOS (compartilhado pela interface e pelos comandos)
+# =============================================================================
+import os
+import re
+import sqlite3
+from datetime import datetime
+
+import instrumentacao
+
+# Local do banco: variável CADASTROS_DB ou, por padrão, ao lado do programa (independe da pasta atual)
+CAMINHO_PADRAO = os.environ.get('CADASTROS_DB') or os.path.join(os.path.dirname(os.path.abspath(__file__)), 'cadastros.db')
+# Modo ajustado para vários postos usando o mesmo banco (CADASTROS_DB_OTIMIZADO=1 ou conectar(otimizado=True))
+MODO_OTIMIZADO = os.environ.get('CADASTROS_DB_OTIMIZADO', '') not in ('', '0')
+
+# Parâmetros do modo ajustado
+TEMPO_ESPERA_S = 15                 # quanto um posto espera por outro antes de "database is locked"
+TAMANHO_MMAP = 256 * 1024 * 1024    # bytes do arquivo lidos por E/S mapeada em memória
+TAMANHO_CACHE_KB = 64 * 1024        # cache de páginas por conexão
+
+# Ordem das colunas da tabela 'alunos', usada para gravar e exportar os cadastros.
+# A idade não é gravada: é calculada na consulta a partir da data de nascimento (IDADE_SQL).
+COLUNAS = ['codigo', 'data_inscricao', 'area', 'nome_completo', 'curso', 'sexo', 'data_nascimento', 'cpf', 'estado_civil', 'cep', 'rua', 'numero', 'complemento', 'ponto_referencia', 'contato1', 'contato2', 'escola', 'frequenta_escola', 'serie', 'ensino', 'trabalha', 'profissao', 'renda_mensal', 'nome_pai', 'nome_mae', 'num_irmaos', 'pessoas_residencia','mora_pais', 'mora_mae_pai', 'mora_parentes', 'mora_conjuge', 'nome_conjuge', 'renda_conjuge', 'num_filhos', 'renda_familiar', 'beneficio_gov', 'qual_beneficio', 'desc_familiar','data_inicio_curso', 'data_conclusao_curso', 'desistencia', 'doc_id', 'doc_cpf', 'doc_residencia', 'doc_vacina', 'doc_foto', 'observacao', 'aceite_declaracao']
+
+# Colunas de "Sim"/"Não" na tela (caixas de seleção e perguntas de sim ou não), gravadas como 1/0
+COLUNAS_SIM_NAO = ['frequenta_escola', 'trabalha', 'mora_pais', 'mora_mae_pai', 'mora_parentes', 'mora_conjuge', 'beneficio_gov', 'doc_id', 'doc_cpf', 'doc_residencia', 'doc_vacina', 'doc_foto', 'aceite_declaracao']
+# Datas 'dd/mm/YYYY' na tela, gravadas como 'YYYY-mm-dd' (ordenáveis e indexáveis como texto)
+COLUNAS_DATA = ['data_inscricao', 'data_nascimento', 'data_inicio_curso', 'data_conclusao_curso']
+# Valores em reais ("1.234,56" na tela), gravados como REAL
+COLUNAS_VALOR = ['renda_mensal', 'renda_conjuge', 'renda_familiar']
+# Quantidades, gravadas como INTEGER
+COLUNAS_QUANTIDADE = ['num_irmaos', 'pessoas_residencia', 'num_filhos']
+
+# Nomes usados nas mensagens de erro de conversão
+ROTULOS = {'data_inscricao': "Data da Inscrição", 'data_nascimento': "Data de Nascimento", 'data_inicio_curso': "Data de Início do Curso",
+           'data_conclusao_curso': "Data de Conclusão do Curso", 'renda_mensal': "Renda Mensal", 'renda_conjuge': "Renda do Cônjuge",
+           'renda_familiar': "Renda Familiar", 'num_irmaos': "N° de irmãos", 'pessoas_residencia': "Pessoas na residência", 'num_filhos': "N° de filhos"}
+
+# Idade em anos completos na data de hoje, calculada pelo SQLite a partir de data_nascimento ('YYYY-mm-dd')
+IDADE_SQL = ("CASE WHEN data_nascimento IS NOT NULL THEN CAST(strftime('%Y', 'now', 'localtime') AS INTEGER) - CAST(substr(data_nascimento, 1, 4) AS INTEGER)"
+             " - (strftime('%m-%d', 'now', 'localtime') < substr(data_nascimento, 6, 5)) END")
+COLUNAS_COM_IDADE = COLUNAS + ['idade']
+# 'versao' aumenta a cada gravação do cadastro: quem carregou uma versão anterior não sobrescreve a alteração de outro posto
+SELECT_ALUNOS = f"SELECT {', '.join(COLUNAS)}, {IDADE_SQL} AS idade, versao FROM alunos"
+
+# Colunas lidas pelos triggers do resumo e da pesquisa: alterações só em outras colunas não mexem neles
+COLUNAS_RESUMO = ['curso', 'area', 'data_nascimento', 'beneficio_gov', 'desistencia']
+COLUNAS_PESQUISA = ['codigo', 'nome_completo', 'cpf', 'curso']
+# Termos da pesquisa com até este número de caracteres casam com boa parte da tabela e saem em ordem de nome (ver pesquisar_alunos)
+PREFIXO_CURTO = 3
+
+def tipo_coluna(coluna):
+    if coluna == 'codigo': return 'INTEGER PRIMARY KEY'
+    if coluna in COLUNAS_VALOR: return 'REAL'
+    if coluna in COLUNAS_QUANTIDADE: return 'INTEGER'
+    if coluna in COLUNAS_SIM_NAO: return f'INTEGER CHECK ({coluna} IN (0, 1))'
+    return 'TEXT'
+
+def sql_criar_alunos(tabela='alunos'):
+    colunas = [f"{coluna} {tipo_coluna(coluna)}" for coluna in COLUNAS] + ["versao INTEGER NOT NULL DEFAULT 1"]
+    return f"CREATE TABLE IF NOT EXISTS {tabela} (\n    " + ',\n    '.join(colunas) + "\n)"
+
+def conectar(caminho=None, otimizado=None, **opcoes):
+    if otimizado is None: otimizado = MODO_OTIMIZADO
+    if otimizado: opcoes.setdefault('timeout', TEMPO_ESPERA_S)
+    # Com o diagnóstico ligado, cada consulta é cronometrada (ver instrumentacao.py)
+    if instrumentacao.ATIVO: opcoes.setdefault('factory', instrumentacao.ConexaoInstrumentada)
+    conn = sqlite3.connect(caminho or CAMINHO_PADRAO, **opcoes)
+    # Nesta conexão, linhas substituídas por REPLACE também disparam os triggers de DELETE (resumo e pesquisa).
+    # O PRAGMA vale só para ela: um REPLACE feito por outro programa (sqlite3, DB Browser) deixa o resumo
+    # contando a linha antiga; 'python estatisticas.py --recalcular' o refaz.
+    conn.execute("PRAGMA recursive_triggers = ON")
+    if otimizado: ajustar_desempenho(conn)
+    criar_esquema(conn)
+    return conn
+
+def ajustar_desempenho(conn):
+    # WAL permite leituras simultâneas a uma escrita e grava menos vezes em disco com synchronous=NORMAL.
+    # Atenção: o WAL exige que todos os processos estejam na mesma máquina (não funciona em pasta de rede).
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute(f"PRAGMA busy_timeout={TEMPO_ESPERA_S * 1000}")
+    conn.execute(f"PRAGMA mmap_size={TAMANHO_MMAP}")
+    conn.execute(f"PRAGMA cache_size=-{TAMANHO_CACHE_KB}")
+
+def criar_esquema(conn):
+    import migracoes
+    cursor = conn.cursor()
+    if cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'alunos'").fetchone() is None:
+        cursor.execute(sql_criar_alunos()); cursor.execute(f"PRAGMA user_version = {migracoes.VERSAO_ESQUEMA}")
+    else:
+        # Bancos criados por versões anteriores do programa são convertidos aqui, uma única vez
+        migracoes.migrar(conn)
+    try:
+        cursor.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_cpf ON alunos (cpf)")
+    except sqlite3.OperationalError: pass
+    # Índice usado pela paginação por chave (nome_completo, codigo) da lista de alunos
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_nome ON alunos (nome_completo, codigo)")
+    # Filtros do lote, da exportação e das estatísticas: curso (com ou sem período), área e período de inscrição
+    cursor.execute("DROP INDEX IF EXISTS idx_curso")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_curso_inscricao ON alunos (curso, data_inscricao)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_area ON alunos (area)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_data_inscricao ON alunos (data_inscricao)")
+    criar_pesquisa(cursor)
+    criar_resumo(cursor)
+    criar_anexos(cursor)
+    conn.commit()
+
+def criar_pesquisa(cursor):
+    # Tabela FTS5 da pesquisa incremental, mantida em sincronia com 'alunos' por triggers.
+    # O CPF é indexado só com dígitos e o tokenizador ignora acentos e maiúsculas.
+    ja_existia = tem_pesquisa(cursor)
+    try:
+        cursor.execute("CREATE VIRTUAL TABLE IF NOT EXISTS alunos_fts USING fts5(nome_completo, cpf, curso, codigo, tokenize = 'unicode61 remove_diacritics 2')")
+    except sqlite3.OperationalError:
+        print("SQLite sem suporte a FTS5; a pesquisa usará LIKE."); return
+    valores_fts = "new.codigo, new.nome_completo, replace(replace(new.cpf, '.', ''), '-', ''), new.curso, new.codigo"
+    # Um REPLACE feito fora de conectar() (sem recursive_triggers) não dispara o trigger de DELETE,
+    # por isso o de INSERT remove antes a entrada do mesmo código
+    cursor.execute(f'''CREATE TRIGGER IF NOT EXISTS alunos_fts_ai AFTER INSERT ON alunos BEGIN
+            DELETE FROM alunos_fts WHERE rowid = new.codigo;
+            INSERT INTO alunos_fts (rowid, nome_completo, cpf, curso, codigo) VALUES ({valores_fts});
+        END''')
+    cursor.execute('''CREATE TRIGGER IF NOT EXISTS alunos_fts_ad AFTER DELETE ON alunos BEGIN
+            DELETE FROM alunos_fts WHERE rowid = old.codigo;
+        END''')
+    cursor.execute(f'''CREATE TRIGGER IF NOT EXISTS alunos_fts_au AFTER UPDATE OF {', '.join(COLUNAS_PESQUISA)} ON alunos BEGIN
+            DELETE FROM alunos_fts WHERE rowid = old.codigo;
+            INSERT INTO alunos_fts (rowid, nome_completo, cpf, curso, codigo) VALUES ({valores_fts});
+        END''')
+    if not ja_existia:
+        cursor.execute("INSERT INTO alunos_fts (rowid, nome_completo, cpf, curso, codigo) SELECT codigo, nome_completo, replace(replace(cpf, '.', ''), '-', ''), curso, codigo FROM alunos")
+
+# Dimensões da tabela 'resumo_alunos': (nome, expressão SQL sobre a linha {r}, que é 'new' ou 'old').
+# A idade é guardada como data de nascimento, que não muda com o tempo; a idade exata e a faixa etária são
+# calculadas na leitura (as datas distintas são bem menos que os alunos).
+DIMENSOES_RESUMO = [
+    ('total', "''"),
+    ('curso', "coalesce({r}.curso, '')"),
+    ('area', "coalesce({r}.area, '')"),
+    ('data_nascimento', "coalesce({r}.data_nascimento, '')"),
+    ('beneficio_gov', "CASE {r}.beneficio_gov WHEN 1 THEN 'Sim' WHEN 0 THEN 'Não' ELSE '' END"),
+    ('desistencia', "CASE WHEN trim(coalesce({r}.desistencia, '')) <> '' THEN 'Sim' ELSE 'Não' END"),
+]
+
+def criar_resumo(cursor):
+    # Contagens pré-calculadas para o painel, mantidas por triggers a cada INSERT/UPDATE/DELETE em 'alunos'
+    ja_existia = cursor.execute("SELECT 1 FROM sqlite_master WHERE name = 'resumo_alunos'").fetchone() is not None
+    cursor.execute("CREATE TABLE IF NOT EXISTS resumo_alunos (dimensao TEXT NOT NULL, valor TEXT NOT NULL, total INTEGER NOT NULL, PRIMARY KEY (dimensao, valor)) WITHOUT ROWID")
+    somar = ''.join(f"INSERT INTO resumo_alunos (dimensao, valor, total) VALUES ('{nome}', {expressao.format(r='new')}, 1) ON CONFLICT (dimensao, valor) DO UPDATE SET total = total + 1;\n"
+                    for nome, expressao in DIMENSOES_RESUMO)
+    subtrair = ''.join(f"UPDATE resumo_alunos SET total = total - 1 WHERE dimensao = '{nome}' AND valor = {expressao.format(r='old')};\n"
+                       for nome, expressao in DIMENSOES_RESUMO) + "DELETE FROM resumo_alunos WHERE total <= 0;\n"
+    cursor.execute(f"CREATE TRIGGER IF NOT EXISTS resumo_alunos_ai AFTER INSERT ON alunos BEGIN\n{somar}END")
+    cursor.execute(f"CREATE TRIGGER IF NOT EXISTS resumo_alunos_ad AFTER DELETE ON alunos BEGIN\n{subtrair}END")
+    cursor.execute(f"CREATE TRIGGER IF NOT EXISTS resumo_alunos_au AFTER UPDATE OF {', '.join(COLUNAS_RESUMO)} ON alunos BEGIN\n{subtrair}{somar}END")
+    if not ja_existia: recalcular_resumo(cursor)
+
+def recalcular_resumo(cursor):
+    """Refaz o resumo inteiro com GROUP BY (usado na criação e para corrigir divergências)."""
+    cursor.execute("DELETE FROM resumo_alunos")
+    for nome, expressao in DIMENSOES_RESUMO:
+        valor = expressao.format(r='alunos')
+        cursor.execute(f"INSERT INTO resumo_alunos (dimensao, valor, total) SELECT '{nome}', {valor}, count(*) FROM alunos GROUP BY {valor}")
+
+def criar_anexos(cursor):
+    # Documentos digitalizados de cada aluno; o arquivo fica em disco, com o SHA-256 do conteúdo como nome (ver anexos.py)
+    cursor.execute('''CREATE TABLE IF NOT EXISTS anexos (
+            id INTEGER PRIMARY KEY, codigo INTEGER NOT NULL REFERENCES alunos (codigo), tipo TEXT NOT NULL,
+            hash TEXT NOT NULL, extensao TEXT NOT NULL, nome_original TEXT, tamanho INTEGER, data_envio TEXT NOT NULL,
+            UNIQUE (codigo, tipo, hash)
+        )''')
+    # Antes de apagar um arquivo, confere se outro anexo usa o mesmo conteúdo
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_anexos_hash ON anexos (hash)")
+
+def tem_pesquisa(conn):
+    return conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'alunos_fts'").fetchone() is not None
+
+def validar_cadastro(dados):
+    """Mensagem de erro se faltar um campo obrigatório ou um valor for inválido, ou None (mesma regra da tela e da importação)."""
+    if not dados.get('nome_completo') or not dados.get('cpf') or not dados.get('curso'):
+        return "Nome, CPF e Curso são campos obrigatórios!"
+    try: para_banco(dados)
+    except ValueError as e: return str(e)
+    return None
+
+def validar_alteracoes(alteracoes):
+    """Como validar_cadastro, para só os campos alterados: os obrigatórios enviados não podem estar vazios."""
+    desconhecidos = [coluna for coluna in alteracoes if coluna not in COLUNAS or coluna == 'codigo']
+    if desconhecidos: return f"Campos que não podem ser alterados: {', '.join(map(str, desconhecidos))}."
+    if any(not str(alteracoes[coluna] or '').strip() for coluna in ('nome_completo', 'cpf', 'curso') if coluna in alteracoes):
+        return "Nome, CPF e Curso são campos obrigatórios!"
+    try: para_banco(alteracoes)
+    except ValueError as e: return str(e)
+    return None
+
+# =============================================================================
+# CONVERSÃO ENTRE OS VALORES DA TELA (texto) E OS TIPOS GRAVADOS NO BANCO
+# =============================================================================
+def data_iso(data):
+    """'dd/mm/YYYY' (ou já 'YYYY-mm-dd') -> 'YYYY-mm-dd'; vazio -> None; ValueError se inválida."""
+    if data is None or isinstance(data, str) and not data.strip(): return None
+    if hasattr(data, 'strftime'): return data.strftime('%Y-%m-%d')
+    data = data.strip()
+    formato = '%Y-%m-%d' if re.fullmatch(r'\d{4}-\d{2}-\d{2}', data) else '%d/%m/%Y'
+    return datetime.strptime(data, formato).strftime('%Y-%m-%d')
+
+def data_br(data):
+    return f"{data[8:10]}/{data[5:7]}/{data[0:4]}" if data else ''
+
+def valor_decimal(valor):
+    """'R$ 1.234,56', '1234.56' ou '3.000' -> float; vazio -> None."""
+    if valor is None or isinstance(valor, (int, float)): return None if valor is None else float(valor)
+    texto = valor.replace('R$', '').replace(' ', '').strip()
+    if not texto: return None
+    if ',' in texto: texto = texto.replace('.', '').replace(',', '.')
+    elif re.fullmatch(r'\d{1,3}(\.\d{3})+', texto): texto = texto.replace('.', '')
+    return float(texto)
+
+def valor_inteiro(valor):
+    if valor is None or isinstance(valor, int): return valor
+    if isinstance(valor, float):
+        if not valor.is_integer(): raise ValueError(valor)
+        return int(valor)
+    return int(valor.strip()) if valor.strip() else None
+
+def valor_sim_nao(valor):
+    if valor is None or valor == '': return None
+    if isinstance(valor, (bool, int)): return int(bool(valor))
+    if valor in ('Sim', 'Não'): return int(valor == 'Sim')
+    raise ValueError(valor)
+
+def converter_valor(coluna, valor):
+    """Valor da tela -> tipo gravado na coluna (ValueError se não puder ser convertido)."""
+    if coluna in COLUNAS_DATA: return data_iso(valor)
+    if coluna in COLUNAS_VALOR: return valor_decimal(valor)
+    if coluna in COLUNAS_QUANTIDADE: return valor_inteiro(valor)
+    if coluna in COLUNAS_SIM_NAO: return valor_sim_nao(valor)
+    return valor
+
+def para_banco(dados):
+    """Cadastro como na tela (textos) -> dict com os tipos do banco; ValueError com o nome do campo inválido."""
+    convertido = {}
+    for coluna in COLUNAS:
+        if coluna not in dados: continue
+        try: convertido[coluna] = converter_valor(coluna, dados[coluna])
+        except ValueError:
+            if coluna in COLUNAS_DATA: raise ValueError(f"{ROTULOS[coluna]} inválida: '{dados[coluna]}' (use dd/mm/aaaa).")
+            raise ValueError(f"Valor inválido em '{ROTULOS.get(coluna, coluna)}': '{dados[coluna]}'.")
+    return convertido
+
+def para_exibicao(dados):
+    """Cadastro lido do banco -> textos da tela; valores que já estão no formato da tela são mantidos."""
+    exibicao = {}
+    for coluna, valor in dados.items():
+        if valor is None: valor = ''
+        elif coluna in COLUNAS_DATA and isinstance(valor, str) and re.fullmatch(r'\d{4}-\d{2}-\d{2}', valor): valor = data_br(valor)
+        elif coluna in COLUNAS_VALOR and isinstance(valor, (int, float)): valor = f"{valor:,.2f}".translate(str.maketrans(',.', '.,'))
+        elif coluna in COLUNAS_SIM_NAO and isinstance(valor, int): valor = 'Sim' if valor else 'Não'
+        exibicao[coluna] = str(valor)
+    return exibicao
+
+def calcular_idade(data_nascimento, hoje=None):
+    """Idade em anos a partir de 'dd/mm/YYYY' (ValueError se a data for inválida)."""
+    data_nasc = datetime.strptime(data_nascimento, '%d/%m/%Y'); hoje = hoje or datetime.today()
+    return hoje.year - data_nasc.year - ((hoje.month, hoje.day) < (data_nasc.month, data_nasc.day))
+
+def proximo_codigo(conn):
+    resultado = conn.execute("SELECT MAX(codigo) FROM alunos").fetchone()[0]
+    return (resultado if resultado is not None else 0) + 1
+
+def buscar_aluno(conn, codigo):
+    """Cadastro com os tipos do banco e a idade calculada (dict), ou None."""
+    cursor = conn.cursor(); cursor.execute(f"{SELECT_ALUNOS} WHERE codigo = ?", (codigo,))
+    aluno_encontrado = cursor.fetchone()
+    if aluno_encontrado is None: return None
+    nomes_colunas = [d[0] for d in cursor.description]
+    return dict(zip(nomes_colunas, aluno_encontrado))
+
+def cpf_em_uso(conn, cpf, codigo):
+    """Código de outro aluno que já usa o CPF, ou None."""
+    outro_aluno = conn.execute("SELECT codigo FROM alunos WHERE cpf = ? AND codigo != ?", (cpf, codigo)).fetchone()
+    return outro_aluno[0] if outro_aluno else None
+
+class CadastroAlterado(Exception):
+    """O cadastro foi gravado por outro posto (ou excluído) depois de carregado."""
+    def __init__(self, codigo, versao_atual):
+        super().__init__(f"O cadastro {codigo} foi alterado em outro posto depois de carregado." if versao_atual is not None
+                         else f"O cadastro {codigo} não existe mais.")
+        self.codigo = codigo; self.versao_atual = versao_atual
+
+def salvar_aluno(conn, dados):
+    # 'dados' já com os tipos do banco (para_banco); colunas ausentes ficam NULL.
+    # Um código existente é atualizado no lugar (sem apagar e reinserir a linha) e ganha uma nova versão.
+    valores = [dados.get(col) for col in COLUNAS]
+    placeholders = ', '.join(['?'] * len(valores))
+    atualizar = ', '.join(f"{col} = excluded.{col}" for col in COLUNAS if col != 'codigo')
+    conn.execute(f"INSERT INTO alunos ({', '.join(COLUNAS)}) VALUES ({placeholders}) ON CONFLICT (codigo) DO UPDATE SET {atualizar}, versao = versao + 1", valores)
+    conn.commit()
+
+def gravar_cadastro(conn, dados):
+    """Salva um cadastro (tipos do banco) conferindo o CPF; sem 'codigo', cria um aluno novo.
+
+    O código do aluno novo é calculado dentro da mesma transação BEGIN IMMEDIATE do INSERT, então
+    dois postos salvando ao mesmo tempo nunca recebem o mesmo código nem sobrescrevem um ao outro.
+    Devolve (codigo, None), ou (None, código do outro aluno) se o CPF já estiver em uso.
+    """
+    dados = dict(dados)
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        outro_aluno = cpf_em_uso(conn, dados.get('cpf'), dados.get('codigo') or 0)
+        if outro_aluno is not None: conn.rollback(); return None, outro_aluno
+        if dados.get('codigo') is None: dados['codigo'] = proximo_codigo(conn)
+        salvar_aluno(conn, dados)
+    except Exception:
+        conn.rollback(); raise
+    return dados['codigo'], None
+
+def alterar_cadastro(conn, codigo, versao, alteracoes):
+    """Grava só as colunas alteradas (tipos do banco) de um cadastro carregado na 'versao' informada.
+
+    O UPDATE só acontece se ninguém gravou o aluno depois dessa versão; caso contrário levanta
+    CadastroAlterado e nada é gravado. Devolve (nova versão, None), ou (None, código do outro aluno)
+    se o CPF alterado já estiver em uso. Sem alterações nada é gravado e a versão continua a mesma.
+    """
+    desconhecidos = [col for col in alteracoes if col not in COLUNAS or col == 'codigo']
+    if desconhecidos: raise ValueError(f"Campos que não podem ser alterados: {', '.join(map(str, desconhecidos))}.")
+    colunas = [col for col in COLUNAS if col in alteracoes]
+    if not colunas:
+        atual = conn.execute("SELECT versao FROM alunos WHERE codigo = ?", (codigo,)).fetchone()
+        if atual is None or atual[0] != versao: raise CadastroAlterado(codigo, atual[0] if atual else None)
+        return versao, None
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        if 'cpf' in alteracoes:
+            outro_aluno = cpf_em_uso(conn, alteracoes['cpf'], codigo)
+            if outro_aluno is not None: conn.rollback(); return None, outro_aluno
+        atribuicoes = ''.join(f"{col} = ?, " for col in colunas)
+        cursor = conn.execute(f"UPDATE alunos SET {atribuicoes}versao = versao + 1 WHERE codigo = ? AND versao = ?", [alteracoes[col] for col in colunas] + [codigo, versao])
+        if cursor.rowcount == 0:
+            atual = conn.execute("SELECT versao FROM alunos WHERE codigo = ?", (codigo,)).fetchone()
+            raise CadastroAlterado(codigo, atual[0] if atual else None)
+        conn.commit()
+    except Exception:
+        conn.rollback(); raise
+    return versao + 1, None
+
+def pagina_alunos(conn, apos=None, limite=200):
+    """Próxima página (codigo, nome, cpf) em ordem de nome, a partir da chave (nome, codigo) 'apos'."""
+    if apos:
+        return conn.execute("SELECT codigo, nome_completo, cpf FROM alunos WHERE (nome_completo, codigo) > (?, ?) ORDER BY nome_completo, codigo LIMIT ?", (*apos, limite)).fetchall()
+    return conn.execute("SELECT codigo, nome_completo, cpf FROM alunos ORDER BY nome_completo, codigo LIMIT ?", (limite,)).fetchall()
+
+def montar_consulta_fts(texto):
+    """Converte o texto digitado em uma consulta FTS5 por prefixo (None se vazio)."""
+    digitos = re.sub(r'[\s.\-/]', '', texto)
+    # Só 0-9: isdigit() aceitaria '²', que int() recusa
+    if re.fullmatch(r'[0-9]+', digitos):
+        # CPF (com ou sem pontuação) ou código (com ou sem zeros à esquerda)
+        return f'cpf : "{digitos}"* OR codigo : "{int(digitos)}"*'
+    termos = re.findall(r'\w+', texto)
+    return ' '.join(f'"{termo}"*' for termo in termos) or None
+
+def pesquisar_alunos(conn, texto, limite=200):
+    """Alunos (codigo, nome, cpf) cujo nome, CPF, curso ou código combinam com o texto digitado."""
+    if tem_pesquisa(conn):
+        consulta = montar_consulta_fts(texto)
+        if consulta is None: return []
+        if max(len(termo) for termo in re.findall(r'\w+', texto)) <= PREFIXO_CURTO:
+            # Ordenar por relevância pontuaria (bm25) todos os milhares de alunos que casam com "m"*; em vez disso
+            # percorre idx_nome em ordem de nome e para no limite ('+codigo' impede o planejador de trocar o índice)
+            return conn.execute("SELECT codigo, nome_completo, cpf FROM alunos WHERE +codigo IN (SELECT rowid FROM alunos_fts WHERE alunos_fts MATCH ?) ORDER BY nome_completo, codigo LIMIT ?", (consulta, limite)).fetchall()
+        return conn.execute("SELECT a.codigo, a.nome_completo, a.cpf FROM alunos_fts JOIN alunos a ON a.codigo = alunos_fts.rowid WHERE alunos_fts MATCH ? ORDER BY rank LIMIT ?", (consulta, limite)).fetchall()
+    padrao = f"%{texto}%"
+    return conn.execute("SELECT codigo, nome_completo, cpf FROM alunos WHERE nome_completo LIKE ? OR cpf LIKE ? OR curso LIKE ? OR codigo = ? ORDER BY nome_completo LIMIT ?", (padrao, padrao, padrao, texto, limite)).fetchall()
+
+def listar_alunos(conn, curso=None, data_inicio=None, data_fim=None, area=None, lote=500):
+    """Percorre os cadastros (dicts com os tipos do banco e a idade) filtrando por curso, área e período de inscrição ('dd/mm/YYYY').
+
+    As linhas são lidas do cursor em blocos de 'lote' (fetchmany), então o uso de memória não cresce com a tabela.
+    """
+    condicoes, parametros = [], []
+    if curso: condicoes.append("curso = ?"); parametros.append(curso)
+    if area: condicoes.append("area = ?"); parametros.append(area)
+    if data_inicio: condicoes.append("data_inscricao >= ?"); parametros.append(data_iso(data_inicio))
+    if data_fim: condicoes.append("data_inscricao <= ?"); parametros.append(data_iso(data_fim))
+    where = f"WHERE {' AND '.join(condicoes)}" if condicoes else ""
+    cursor = conn.cursor(); cursor.execute(f"{SELECT_ALUNOS} {where} ORDER BY codigo", parametros)
+    nomes_colunas = [d[0] for d in cursor.description]
+    while True:
+        linhas = cursor.fetchmany(lote)
+        if not linhas: return
+        for linha in linhas: yield dict(zip(nomes_colunas, linha))
+
@@ -0,0 +1 @@
+# Medições de desempenho do sistema de cadastro (executar a partir da pasta do programa).
@@ -0,0 +1,93 @@
+# =============================================================================
+# TESTE DE CARGA DO SERVIÇO DE CADASTRO (vários postos usando o mesmo serviço)
+# =============================================================================
+# Uso: python -m benchmarks.carga_servico --postos 8 --duracao 10 [--url http://127.0.0.1:8765]
+#
+# Sem --url, sobe um serviço local (python servico.py) com um banco temporário. Cada posto é um
+# processo que alterna cadastros novos, páginas da lista, pesquisas e cargas de um cadastro.
+# Ao final confere que nenhum código foi entregue a dois alunos.
+import argparse
+import multiprocessing
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+import cliente_servico
+
+PASTA_PROGRAMA = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Proporção de cada operação no sorteio de um posto
+OPERACOES = [('salvar', 2), ('pagina', 3), ('pesquisa', 3), ('buscar', 2)]
+
+def _posto(url, posto, duracao, resultados):
+    cliente = cliente_servico.conectar(url); rnd = random.Random(posto)
+    tempos = {nome: [] for nome, _ in OPERACOES}; codigos = []; falhas = 0; sequencia = 0
+    nomes, pesos = zip(*OPERACOES); fim = time.perf_counter() + duracao
+    while time.perf_counter() < fim:
+        operacao = rnd.choices(nomes, pesos)[0]; inicio = time.perf_counter()
+        try:
+            if operacao == 'salvar':
+                sequencia += 1
+                dados = {'nome_completo': f"Aluno {posto}-{sequencia}", 'cpf': f"{posto:04d}{sequencia:07d}", 'curso': 'Violão', 'data_inscricao': time.strftime('%Y-%m-%d')}
+                codigo, _ = cliente_servico.gravar_cadastro(cliente, dados); codigos.append(codigo)
+            elif operacao == 'pagina': cliente_servico.pagina_alunos(cliente, ("Aluno", rnd.randint(0, 1000)))
+            elif operacao == 'pesquisa': cliente_servico.pesquisar_alunos(cliente, rnd.choice(["aluno 1", "violao", "000"]))
+            elif codigos: cliente_servico.buscar_aluno(cliente, rnd.choice(codigos))
+        except (cliente_servico.ErroServico, ConnectionError): falhas += 1; continue
+        tempos[operacao].append(time.perf_counter() - inicio)
+    resultados.put((tempos, codigos, falhas))
+
+def percentil(valores, p):
+    valores = sorted(valores)
+    return valores[min(len(valores) - 1, int(len(valores) * p))] if valores else 0.0
+
+def subir_servico(caminho, conexoes):
+    # Porta 0: o sistema escolhe uma porta livre, informada na primeira linha da saída
+    processo = subprocess.Popen([sys.executable, os.path.join(PASTA_PROGRAMA, 'servico.py'), '--banco', caminho, '--porta', '0', '--conexoes', str(conexoes)],
+                                stdout=subprocess.PIPE, text=True)
+    linha = processo.stdout.readline()
+    if 'http://' not in linha: processo.kill(); raise RuntimeError("O serviço não iniciou.")
+    return processo, linha[linha.index('http://'):].strip()
+
+def executar(url, postos, duracao):
+    """Roda os postos contra o serviço e devolve vazão, latências (ms) e códigos repetidos."""
+    resultados = multiprocessing.Queue()
+    processos = [multiprocessing.Process(target=_posto, args=(url, i + 1, duracao, resultados)) for i in range(postos)]
+    for processo in processos: processo.start()
+    tempos = {nome: [] for nome, _ in OPERACOES}; codigos = []; falhas = 0
+    for _ in processos:
+        tempos_posto, codigos_posto, falhas_posto = resultados.get()
+        for nome, valores in tempos_posto.items(): tempos[nome] += valores
+        codigos += codigos_posto; falhas += falhas_posto
+    for processo in processos: processo.join()
+    return {
+        'operacoes': {nome: {'ops_por_segundo': len(valores) / duracao, 'p50_ms': percentil(valores, 0.5) * 1000, 'p95_ms': percentil(valores, 0.95) * 1000}
+                      for nome, valores in tempos.items()},
+        'cadastros': len(codigos), 'codigos_repetidos': len(codigos) - len(set(codigos)), 'falhas': falhas,
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Teste de carga do serviço HTTP de cadastro com vários postos simultâneos.")
+    parser.add_argument('--url', help="serviço já em execução (padrão: sobe um serviço local com banco temporário)")
+    parser.add_argument('--banco', help="banco do serviço local (padrão: arquivo temporário; nunca use o banco de produção)")
+    parser.add_argument('--postos', type=int, default=8)
+    parser.add_argument('--conexoes', type=int, default=4, help="conexões do serviço local com o banco")
+    parser.add_argument('--duracao', type=float, default=10.0, help="segundos de teste")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as pasta:
+        servico = None; url = args.url
+        if not url: servico, url = subir_servico(args.banco or os.path.join(pasta, 'carga.db'), args.conexoes)
+        try: resultado = executar(url, args.postos, args.duracao)
+        finally:
+            if servico: servico.terminate(); servico.wait()
+    print(f"Serviço {url} ({args.postos} postos, {args.duracao:g}s):")
+    for nome, medidas in resultado['operacoes'].items():
+        print(f"  {nome:9} {medidas['ops_por_segundo']:8.1f} ops/s   p50 {medidas['p50_ms']:7.1f} ms   p95 {medidas['p95_ms']:7.1f} ms")
+    print(f"  {resultado['cadastros']} cadastro(s) novo(s), {resultado['codigos_repetidos']} código(s) repetido(s), {resultado['falhas']} falha(s)")
+    return 1 if resultado['codigos_repetidos'] or resultado['falhas'] else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,157 @@
+# =============================================================================
+# MEDIÇÕES DE DESEMPENHO CONFORME O BANCO CRESCE (resultado em JSON)
+# =============================================================================
+# Uso: python -m benchmarks.desempenho --tamanhos 1000 10000 100000 1000000 --saida resultado.json
+#      python -m benchmarks.desempenho --tamanhos 1000 10000 --comparar resultado_anterior.json
+#
+# Um único banco de teste cresce de um tamanho para o próximo (com o gerador de alunos fictícios)
+# e, em cada tamanho, são cronometrados os mesmos caminhos que a interface usa:
+#   salvar    salvar_cadastro: validar_cadastro + para_banco + gravar_cadastro de um aluno novo
+#   editar    salvar_alteracoes: alterar_cadastro de um campo (contato) de um aluno existente
+#   buscar    buscar_e_carregar_aluno: buscar_aluno + para_exibicao
+#   lista     atualizar_lista_alunos: primeira página da lista
+#   rolagem   próxima página a partir de um ponto qualquer da lista
+#   pesquisa  pesquisa incremental por nome (4 letras, em ordem de relevância)
+#   pesquisa_curta  o mesmo com 1 a 3 letras (banco_dados.PREFIXO_CURTO), em ordem de nome
+# A geração das fichas (uma por vez e em lote com o pool de processos) não depende do tamanho
+# do banco e é medida uma vez. Guarde o JSON de cada versão para comparar com --comparar.
+import argparse
+import json
+import os
+import platform
+import random
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from itertools import islice
+
+import banco_dados
+from benchmarks import gerador_alunos
+
+TAMANHOS_PADRAO = [1000, 10000, 100000, 1000000]
+REPETICOES = 200
+FICHAS_LOTE = 48
+# Variação (em relação à medição anterior) a partir da qual --comparar aponta regressão
+LIMITE_REGRESSAO = 1.25
+
+def medir(funcao, repeticoes):
+    """Executa funcao(i) 'repeticoes' vezes e devolve mediana, p95 e mínimo em milissegundos."""
+    tempos = []
+    for i in range(repeticoes):
+        inicio = time.perf_counter(); funcao(i); tempos.append((time.perf_counter() - inicio) * 1000)
+    tempos.sort()
+    return {'mediana_ms': round(tempos[len(tempos) // 2], 4), 'p95_ms': round(tempos[min(len(tempos) - 1, int(len(tempos) * 0.95))], 4),
+            'minimo_ms': round(tempos[0], 4), 'repeticoes': repeticoes}
+
+def medir_banco(conn, repeticoes, rnd):
+    total = conn.execute("SELECT count(*) FROM alunos").fetchone()[0]
+    codigos = [c for (c,) in conn.execute("SELECT codigo FROM alunos ORDER BY random() LIMIT ?", (repeticoes,))]
+    chaves = conn.execute("SELECT nome_completo, codigo FROM alunos ORDER BY random() LIMIT ?", (repeticoes,)).fetchall()
+    # Formulários como a tela os coleta (textos), com CPFs que não colidem com os do gerador; sem código, como um aluno novo
+    formularios = [banco_dados.para_exibicao(gerador_alunos.gerar_aluno(rnd, 10**8 + total + i)) for i in range(repeticoes)]
+    for dados in formularios: del dados['codigo']
+
+    def salvar(i):
+        dados = formularios[i]
+        if banco_dados.validar_cadastro(dados) is None: banco_dados.gravar_cadastro(conn, banco_dados.para_banco(dados))
+
+    versoes = dict(conn.execute(f"SELECT codigo, versao FROM alunos WHERE codigo IN ({', '.join('?' * len(codigos))})", codigos))
+    def editar(i):
+        codigo = codigos[i % len(codigos)]
+        versoes[codigo], _ = banco_dados.alterar_cadastro(conn, codigo, versoes[codigo], {'contato2': f"(85) 3{i % 1000:03d}-{i:04d}"})
+
+    return {
+        'alunos': total,
+        'salvar': medir(salvar, repeticoes),
+        'editar': medir(editar, repeticoes),
+        'buscar': medir(lambda i: banco_dados.para_exibicao(banco_dados.buscar_aluno(conn, codigos[i % len(codigos)])), repeticoes),
+        'lista': medir(lambda i: banco_dados.pagina_alunos(conn, None, 200), repeticoes),
+        'rolagem': medir(lambda i: banco_dados.pagina_alunos(conn, tuple(chaves[i % len(chaves)]), 200), repeticoes),
+        'pesquisa': medir(lambda i: banco_dados.pesquisar_alunos(conn, rnd.choice(gerador_alunos.SOBRENOMES)[:4]), repeticoes),
+        'pesquisa_curta': medir(lambda i: banco_dados.pesquisar_alunos(conn, rnd.choice(gerador_alunos.SOBRENOMES)[:1 + i % banco_dados.PREFIXO_CURTO]), repeticoes),
+    }
+
+def medir_fichas(conn, quantidade):
+    # Importado só aqui: sem o ReportLab as medições do banco continuam funcionando
+    import ficha_pdf
+    import lote_pdf
+    registros = list(islice(banco_dados.listar_alunos(conn), quantidade))
+
+    def uma_ficha(i):
+        ficha_pdf._cache_fichas.clear(); ficha_pdf.renderizar_ficha(registros[i % len(registros)])
+    resultado = {'uma_ficha': medir(uma_ficha, quantidade)}
+    with tempfile.TemporaryDirectory() as pasta:
+        inicio = time.perf_counter(); caminhos, erros = lote_pdf.gerar_lote(registros, pasta); duracao = time.perf_counter() - inicio
+    resultado['lote'] = {'fichas': len(caminhos), 'erros': len(erros), 'total_s': round(duracao, 4), 'por_ficha_ms': round(duracao * 1000 / max(1, len(caminhos)), 4),
+                         'processos': os.cpu_count()}
+    return resultado
+
+def versao_programa():
+    try: return subprocess.run(['git', 'describe', '--always', '--dirty'], capture_output=True, text=True, cwd=os.path.dirname(os.path.abspath(__file__)), check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError): return None
+
+def executar(caminho, tamanhos, repeticoes=REPETICOES, fichas=FICHAS_LOTE, semente=1, progresso=print):
+    rnd = random.Random(semente)
+    resultado = {'versao': versao_programa(), 'data': datetime.now().isoformat(timespec='seconds'), 'python': platform.python_version(),
+                 'sqlite': sqlite3.sqlite_version, 'plataforma': platform.platform(), 'processador': platform.processor() or platform.machine(),
+                 'repeticoes': repeticoes, 'tamanhos': {}}
+    conn = banco_dados.conectar(caminho)
+    try:
+        for tamanho in sorted(tamanhos):
+            inicio = time.perf_counter(); gerador_alunos.popular_banco(conn, tamanho, semente)
+            progresso(f"Banco com {tamanho} alunos pronto em {time.perf_counter() - inicio:.1f}s; medindo...")
+            resultado['tamanhos'][str(tamanho)] = medir_banco(conn, repeticoes, rnd)
+            resultado['tamanhos'][str(tamanho)]['arquivo_mb'] = round(os.path.getsize(caminho) / 2**20, 1)
+        if fichas:
+            progresso(f"Gerando {fichas} fichas uma a uma e em lote...")
+            try: resultado['fichas'] = medir_fichas(conn, fichas)
+            except ImportError as e: progresso(f"Medição das fichas ignorada: {e}")
+    finally: conn.close()
+    return resultado
+
+def comparar(anterior, atual):
+    """Linhas (tamanho, operação, mediana anterior, mediana atual, razão) das operações medidas nas duas execuções."""
+    linhas = []
+    for tamanho, medidas in atual['tamanhos'].items():
+        for operacao, valores in medidas.items():
+            antes = anterior.get('tamanhos', {}).get(tamanho, {}).get(operacao)
+            if isinstance(valores, dict) and isinstance(antes, dict):
+                linhas.append((tamanho, operacao, antes['mediana_ms'], valores['mediana_ms'], valores['mediana_ms'] / antes['mediana_ms'] if antes['mediana_ms'] else 0))
+    if 'fichas' in atual and 'fichas' in anterior:
+        linhas.append(('-', 'uma_ficha', anterior['fichas']['uma_ficha']['mediana_ms'], atual['fichas']['uma_ficha']['mediana_ms'],
+                       atual['fichas']['uma_ficha']['mediana_ms'] / anterior['fichas']['uma_ficha']['mediana_ms']))
+        linhas.append(('-', 'lote', anterior['fichas']['lote']['por_ficha_ms'], atual['fichas']['lote']['por_ficha_ms'],
+                       atual['fichas']['lote']['por_ficha_ms'] / anterior['fichas']['lote']['por_ficha_ms']))
+    return linhas
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Mede salvar, buscar, listar, pesquisar e gerar fichas com bancos de tamanhos crescentes.")
+    parser.add_argument('--tamanhos', type=int, nargs='+', default=TAMANHOS_PADRAO, help="quantidades de alunos medidas")
+    parser.add_argument('--repeticoes', type=int, default=REPETICOES, help="execuções de cada operação por tamanho")
+    parser.add_argument('--fichas', type=int, default=FICHAS_LOTE, help="fichas geradas na medição do PDF (0 = não mede)")
+    parser.add_argument('--banco', help="banco de teste reaproveitado entre execuções (padrão: arquivo temporário)")
+    parser.add_argument('--saida', help="grava o resultado neste arquivo JSON (padrão: mostra na tela)")
+    parser.add_argument('--comparar', metavar='JSON', help="resultado anterior para comparar as medianas")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as pasta:
+        resultado = executar(args.banco or os.path.join(pasta, 'desempenho.db'), args.tamanhos, args.repeticoes, args.fichas,
+                             progresso=lambda texto: print(texto, file=sys.stderr, flush=True))
+    if args.saida:
+        with open(args.saida, 'w', encoding='utf-8') as arquivo: json.dump(resultado, arquivo, ensure_ascii=False, indent=2)
+    else: print(json.dumps(resultado, ensure_ascii=False, indent=2))
+
+    if not args.comparar: return 0
+    with open(args.comparar, encoding='utf-8') as arquivo: anterior = json.load(arquivo)
+    print(f"\nComparação com {anterior.get('versao') or args.comparar} ({anterior.get('data')}):", file=sys.stderr)
+    regressoes = 0
+    for tamanho, operacao, antes, depois, razao in comparar(anterior, resultado):
+        alerta = "  <-- mais lento" if razao >= LIMITE_REGRESSAO else ""; regressoes += bool(alerta)
+        print(f"  {tamanho:>8} {operacao:14} {antes:10.3f} ms -> {depois:10.3f} ms  ({razao:5.2f}x){alerta}", file=sys.stderr)
+    return 1 if regressoes else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
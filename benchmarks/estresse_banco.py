@@ -0,0 +1,96 @@
+# =============================================================================
+# TESTE DE ESTRESSE DO BANCO: VÁRIOS POSTOS GRAVANDO E LENDO AO MESMO TEMPO
+# =============================================================================
+# Uso: python -m benchmarks.estresse_banco --escritores 4 --leitores 4 --duracao 10 --comparar
+import argparse
+import multiprocessing
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+
+import banco_dados
+
+def _escritor(caminho, otimizado, posto, duracao, resultados):
+    # Cada processo simula um posto de recepção salvando cadastros (mesmo caminho do salvar_cadastro)
+    conn = banco_dados.conectar(caminho, otimizado)
+    operacoes = bloqueios = colisoes = 0; fim = time.perf_counter() + duracao; sequencia = 0
+    try:
+        while time.perf_counter() < fim:
+            sequencia += 1; codigo = posto * 10_000_000 + sequencia
+            dados = {'codigo': codigo, 'nome_completo': f"Aluno {posto}-{sequencia}", 'cpf': str(codigo).zfill(11), 'curso': 'Violão', 'data_inscricao': time.strftime('%Y-%m-%d')}
+            try:
+                # Cada posto usa códigos e CPFs só seus: um CPF "já cadastrado" é uma gravação que colidiu com outro posto
+                _, outro_aluno = banco_dados.gravar_cadastro(conn, dados)
+                if outro_aluno is None: operacoes += 1
+                else: colisoes += 1
+            except sqlite3.OperationalError as e:
+                if 'locked' not in str(e) and 'busy' not in str(e): raise
+                conn.rollback(); bloqueios += 1
+    finally:
+        # Mesmo se o processo falhar, o principal recebe o resultado e não fica esperando na fila
+        conn.close(); resultados.put(('escritor', operacoes, bloqueios, colisoes))
+
+def _leitor(caminho, otimizado, duracao, resultados):
+    # Leituras típicas da interface: página da lista, pesquisa e carga de um cadastro
+    conn = banco_dados.conectar(caminho, otimizado)
+    operacoes = bloqueios = 0; fim = time.perf_counter() + duracao
+    try:
+        while time.perf_counter() < fim:
+            try:
+                linhas = banco_dados.pagina_alunos(conn, ("Aluno", 0))
+                banco_dados.pesquisar_alunos(conn, random.choice(["aluno 1", "violao", "000"]))
+                if linhas: banco_dados.buscar_aluno(conn, random.choice(linhas)[0])
+                operacoes += 1
+            except sqlite3.OperationalError as e:
+                if 'locked' not in str(e) and 'busy' not in str(e): raise
+                bloqueios += 1
+    finally:
+        conn.close(); resultados.put(('leitor', operacoes, bloqueios, 0))
+
+def executar(caminho, escritores, leitores, duracao, otimizado):
+    """Roda os processos e devolve, por papel, operações por segundo, erros de bloqueio, colisões e processos que falharam."""
+    banco_dados.conectar(caminho, otimizado).close()
+    resultados = multiprocessing.Queue()
+    processos = [multiprocessing.Process(target=_escritor, args=(caminho, otimizado, i + 1, duracao, resultados)) for i in range(escritores)]
+    processos += [multiprocessing.Process(target=_leitor, args=(caminho, otimizado, duracao, resultados)) for _ in range(leitores)]
+    for processo in processos: processo.start()
+    totais = {'escritor': [0, 0, 0, 0], 'leitor': [0, 0, 0, 0]}
+    for _ in processos:
+        papel, operacoes, bloqueios, colisoes = resultados.get()
+        totais[papel][0] += operacoes; totais[papel][1] += bloqueios; totais[papel][2] += colisoes
+    for processo in processos:
+        processo.join()
+        if processo.exitcode: totais['escritor' if processo in processos[:escritores] else 'leitor'][3] += 1
+    return {papel: {'ops_por_segundo': operacoes / duracao, 'erros_bloqueio': bloqueios, 'colisoes': colisoes, 'falhas': falhas}
+            for papel, (operacoes, bloqueios, colisoes, falhas) in totais.items()}
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Teste de estresse com escritores e leitores simultâneos na tabela 'alunos'.")
+    parser.add_argument('--banco', help="arquivo de teste (padrão: arquivo temporário; nunca use o banco de produção)")
+    parser.add_argument('--escritores', type=int, default=4)
+    parser.add_argument('--leitores', type=int, default=4)
+    parser.add_argument('--duracao', type=float, default=10.0, help="segundos de cada rodada")
+    modo = parser.add_mutually_exclusive_group()
+    modo.add_argument('--otimizado', action='store_true', help="usa o modo ajustado (WAL, pragmas)")
+    modo.add_argument('--comparar', action='store_true', help="roda o modo padrão e o ajustado, cada um num banco novo")
+    args = parser.parse_args(argv)
+
+    modos = [False, True] if args.comparar else [args.otimizado]
+    problemas = 0
+    with tempfile.TemporaryDirectory() as pasta:
+        for otimizado in modos:
+            caminho = args.banco or os.path.join(pasta, f"estresse_{'otimizado' if otimizado else 'padrao'}.db")
+            resultado = executar(caminho, args.escritores, args.leitores, args.duracao, otimizado)
+            print(f"Modo {'ajustado' if otimizado else 'padrão'} ({args.escritores} escritores, {args.leitores} leitores, {args.duracao:g}s):")
+            for papel, medidas in resultado.items():
+                print(f"  {papel:9} {medidas['ops_por_segundo']:10.1f} ops/s   {medidas['erros_bloqueio']} erro(s) de bloqueio"
+                      f"   {medidas['colisoes']} colisão(ões)   {medidas['falhas']} processo(s) com falha")
+                problemas += medidas['colisoes'] + medidas['falhas']
+    # Erros de bloqueio são esperados no modo padrão (é o que a comparação mostra); colisões e falhas não
+    return 1 if problemas else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,108 @@
+# =============================================================================
+# GERADOR DE ALUNOS FICTÍCIOS PARA MEDIÇÕES E TESTES DE CARGA
+# =============================================================================
+# Uso: python -m benchmarks.gerador_alunos --banco teste.db --quantidade 100000 [--semente 1]
+#
+# Os cadastros têm CPF válido (e único por código), nomes brasileiros, datas e valores plausíveis
+# e textos longos em 'desc_familiar' e 'observacao', como os da recepção.
+import argparse
+import random
+import sys
+import time
+from datetime import date, timedelta
+
+import banco_dados
+
+# Linhas gravadas por transação ao popular o banco
+TAMANHO_LOTE = 5000
+
+PRENOMES = ['Ana', 'Maria', 'Francisca', 'Antônia', 'Adriana', 'Juliana', 'Márcia', 'Fernanda', 'Patrícia', 'Aline', 'Letícia', 'Beatriz',
+            'Larissa', 'Camila', 'Jéssica', 'José', 'João', 'Antônio', 'Francisco', 'Carlos', 'Paulo', 'Pedro', 'Lucas', 'Luiz', 'Marcos',
+            'Luís', 'Gabriel', 'Rafael', 'Daniel', 'Marcelo', 'Bruno', 'Eduardo', 'Felipe', 'Raimundo', 'Rodrigo', 'Artênio', 'Cícero', 'Iracema']
+SOBRENOMES = ['Silva', 'Santos', 'Oliveira', 'Souza', 'Rodrigues', 'Ferreira', 'Alves', 'Pereira', 'Lima', 'Gomes', 'Costa', 'Ribeiro',
+              'Martins', 'Carvalho', 'Almeida', 'Lopes', 'Soares', 'Fernandes', 'Vieira', 'Barbosa', 'Rocha', 'Dias', 'Nascimento',
+              'Andrade', 'Moreira', 'Nunes', 'Marques', 'Machado', 'Mendes', 'Freitas', 'Cavalcante', 'Holanda', 'Bezerra', 'Sampaio']
+PALAVRAS = ('a família mora em casa alugada com quatro cômodos e a mãe trabalha como diarista durante a semana enquanto a avó cuida das crianças '
+            'o pai está desempregado há seis meses e faz bicos de pedreiro no bairro a renda vem principalmente do bolsa família e de ajuda '
+            'da igreja o aluno estuda pela manhã na escola municipal e tem interesse em música desde pequeno a irmã mais velha concluiu o curso '
+            'de corte e costura no ano passado e hoje vende roupas na feira o responsável pediu prioridade na turma da tarde por causa do '
+            'horário da escola entregou os documentos pendentes e ficou de trazer o cartão de vacina na próxima semana').split()
+CURSOS = ['Violão', 'Capoeira', 'Corte e Costura', 'Manicure', 'Teatro', 'Cabelereiro']
+AREAS = {'Violão': 'Setor Cultural', 'Capoeira': 'Setor Cultural', 'Teatro': 'Setor Cultural',
+         'Corte e Costura': 'Setor Profissionalizante', 'Manicure': 'Setor Profissionalizante', 'Cabelereiro': 'Setor Profissionalizante'}
+SEXOS = ['Masculino', 'Feminino', 'Outros']
+ESTADOS_CIVIS = ['Solteiro(a)', 'Casado(a)', 'Divorciado(a)', 'Viúvo(a)', 'União Estável']
+ENSINOS = ['Infantil', 'Fundamental', 'Médio', 'Profissional e Tecnológica', 'Superior']
+
+def gerar_cpf(numero):
+    """CPF válido (com dígitos verificadores) a partir de um número; números distintos dão CPFs distintos."""
+    # 7919 é primo com 10^9, então a multiplicação embaralha os números sem repetir nenhum
+    digitos = [int(d) for d in str((numero * 7919) % 10**9).zfill(9)]
+    for _ in range(2):
+        soma = sum(d * peso for d, peso in zip(digitos, range(len(digitos) + 1, 1, -1)))
+        digitos.append(soma * 10 % 11 % 10)
+    return ''.join(map(str, digitos))
+
+def texto_longo(rnd, minimo, maximo):
+    return ' '.join(rnd.choices(PALAVRAS, k=rnd.randint(minimo, maximo))).capitalize() + '.'
+
+def data_aleatoria(rnd, inicio, fim):
+    return (inicio + timedelta(days=rnd.randint(0, (fim - inicio).days))).isoformat()
+
+def gerar_aluno(rnd, codigo, hoje=None):
+    """Cadastro fictício com os tipos do banco (como banco_dados.para_banco devolve)."""
+    hoje = hoje or date.today(); curso = rnd.choice(CURSOS); sim_nao = lambda chance=0.5: int(rnd.random() < chance)
+    nome = f"{rnd.choice(PRENOMES)} {rnd.choice(SOBRENOMES)} {rnd.choice(SOBRENOMES)}"
+    inscricao = data_aleatoria(rnd, hoje - timedelta(days=3 * 365), hoje)
+    return {
+        'codigo': codigo, 'data_inscricao': inscricao, 'area': AREAS[curso], 'nome_completo': nome, 'curso': curso,
+        'sexo': rnd.choice(SEXOS), 'data_nascimento': data_aleatoria(rnd, date(1950, 1, 1), hoje - timedelta(days=7 * 365)),
+        'cpf': gerar_cpf(codigo), 'estado_civil': rnd.choice(ESTADOS_CIVIS), 'cep': f"{rnd.randint(60000000, 61999999)}",
+        'rua': f"Rua {rnd.choice(PRENOMES)} {rnd.choice(SOBRENOMES)}", 'numero': str(rnd.randint(1, 3000)), 'complemento': rnd.choice(['', 'Casa A', 'Apto 101', 'Fundos']),
+        'ponto_referencia': f"Próximo ao mercado {rnd.choice(SOBRENOMES)}", 'contato1': f"(85) 9{rnd.randint(8000, 9999)}-{rnd.randint(0, 9999):04d}",
+        'contato2': rnd.choice(['', f"(85) 3{rnd.randint(200, 299)}-{rnd.randint(0, 9999):04d}"]), 'escola': f"Escola Municipal {rnd.choice(PRENOMES)} {rnd.choice(SOBRENOMES)}",
+        'frequenta_escola': sim_nao(0.7), 'serie': f"{rnd.randint(1, 9)}º ano", 'ensino': rnd.choice(ENSINOS), 'trabalha': sim_nao(0.3),
+        'profissao': rnd.choice(['', 'Estudante', 'Diarista', 'Vendedor(a)', 'Pedreiro', 'Costureira']), 'renda_mensal': round(rnd.uniform(0, 2500), 2),
+        'nome_pai': f"{rnd.choice(PRENOMES)} {rnd.choice(SOBRENOMES)}", 'nome_mae': f"{rnd.choice(PRENOMES)} {rnd.choice(SOBRENOMES)}",
+        'num_irmaos': rnd.randint(0, 6), 'pessoas_residencia': rnd.randint(1, 9), 'mora_pais': sim_nao(0.6), 'mora_mae_pai': sim_nao(0.3),
+        'mora_parentes': sim_nao(0.2), 'mora_conjuge': sim_nao(0.2), 'nome_conjuge': '', 'renda_conjuge': None, 'num_filhos': rnd.randint(0, 4),
+        'renda_familiar': round(rnd.uniform(300, 6000), 2), 'beneficio_gov': sim_nao(0.4), 'qual_beneficio': rnd.choice(['', 'Bolsa Família', 'BPC']),
+        'desc_familiar': texto_longo(rnd, 60, 160), 'data_inicio_curso': None, 'data_conclusao_curso': None, 'desistencia': None,
+        'doc_id': sim_nao(0.9), 'doc_cpf': sim_nao(0.9), 'doc_residencia': sim_nao(0.8), 'doc_vacina': sim_nao(0.6), 'doc_foto': sim_nao(0.7),
+        'observacao': texto_longo(rnd, 20, 80), 'aceite_declaracao': sim_nao(0.95),
+    }
+
+def popular_banco(conn, quantidade, semente=1, tamanho_lote=TAMANHO_LOTE, progresso=None):
+    """Acrescenta alunos fictícios até a tabela ter 'quantidade' linhas; devolve quantos foram gravados."""
+    existentes = conn.execute("SELECT count(*) FROM alunos").fetchone()[0]
+    codigo = banco_dados.proximo_codigo(conn); rnd = random.Random(semente + codigo); hoje = date.today()
+    inserir = f"INSERT INTO alunos ({', '.join(banco_dados.COLUNAS)}) VALUES ({', '.join('?' * len(banco_dados.COLUNAS))})"
+    faltam = max(0, quantidade - existentes); gravados = 0
+    while gravados < faltam:
+        bloco = range(codigo + gravados, codigo + min(faltam, gravados + tamanho_lote))
+        conn.execute("BEGIN")
+        try:
+            conn.executemany(inserir, ([dados[col] for col in banco_dados.COLUNAS] for dados in (gerar_aluno(rnd, c, hoje) for c in bloco)))
+            conn.commit()
+        except Exception:
+            conn.rollback(); raise
+        gravados += len(bloco)
+        if progresso: progresso(existentes + gravados, quantidade)
+    return gravados
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Grava alunos fictícios num banco de teste.")
+    parser.add_argument('--banco', required=True, help="arquivo de teste (nunca use o banco de produção)")
+    parser.add_argument('--quantidade', type=int, default=10000, help="total de alunos que a tabela deve ter")
+    parser.add_argument('--semente', type=int, default=1)
+    args = parser.parse_args(argv)
+
+    conn = banco_dados.conectar(args.banco); inicio = time.perf_counter()
+    try: gravados = popular_banco(conn, args.quantidade, args.semente, progresso=lambda feitos, total: print(f"  {feitos}/{total}", flush=True))
+    finally: conn.close()
+    duracao = time.perf_counter() - inicio
+    print(f"{gravados} aluno(s) gravado(s) em {duracao:.1f}s ({gravados / duracao if duracao else 0:.0f} linhas/s).")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
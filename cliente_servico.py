@@ -0,0 +1,114 @@
+# =============================================================================
+# CLIENTE DO SERVIÇO DE CADASTRO (programa_cadastro.py --servidor URL)
+# =============================================================================
+# As funções têm os mesmos nomes e retornos das de banco_dados, recebendo o cliente no lugar
+# da conexão SQLite; assim a interface usa uma ou outra sem mudar o restante do código.
+import json
+import os
+import re
+from urllib.error import HTTPError, URLError
+from urllib.parse import unquote, urlencode
+from urllib.request import Request, urlopen
+
+import banco_dados
+import instrumentacao
+
+# Tempo máximo (s) de espera por uma resposta do serviço
+TEMPO_LIMITE_S = 30
+
+class ErroServico(Exception):
+    def __init__(self, status, mensagem, resposta):
+        super().__init__(mensagem); self.status = status; self.resposta = resposta
+
+class ClienteServico:
+    """Endereço do serviço. Cada requisição abre a sua conexão, então o cliente pode ser usado por várias threads."""
+
+    def __init__(self, url, tempo_limite=TEMPO_LIMITE_S):
+        self.url = url.rstrip('/'); self.tempo_limite = tempo_limite
+
+    def requisitar(self, metodo, caminho, parametros=None, corpo=None):
+        url = self.url + caminho + (f"?{urlencode(parametros)}" if parametros else '')
+        conteudo = json.dumps(corpo, ensure_ascii=False).encode('utf-8') if corpo is not None else None
+        pedido = Request(url, data=conteudo, method=metodo, headers={'Content-Type': 'application/json'} if conteudo else {})
+        try: return urlopen(pedido, timeout=self.tempo_limite)
+        except HTTPError as e:
+            try: resposta = json.loads(e.read())
+            except ValueError: resposta = {'erro': e.reason}
+            raise ErroServico(e.code, resposta.get('erro', e.reason), resposta) from None
+        except URLError as e: raise ConnectionError(f"Serviço de cadastro indisponível em {self.url}: {e.reason}") from None
+
+    def json(self, metodo, caminho, parametros=None, corpo=None):
+        # Códigos no caminho viram {n} para que /alunos/12 e /alunos/13 somem na mesma linha do diagnóstico
+        with instrumentacao.medir(f"http: {metodo} " + re.sub(r'/\d+', '/{n}', caminho)):
+            with self.requisitar(metodo, caminho, parametros, corpo) as resposta: return json.loads(resposta.read())
+
+    def close(self):
+        pass
+
+def conectar(url, tempo_limite=TEMPO_LIMITE_S):
+    return ClienteServico(url, tempo_limite)
+
+def proximo_codigo(cliente):
+    return cliente.json('GET', '/proximo-codigo')['codigo']
+
+def buscar_aluno(cliente, codigo):
+    try: return cliente.json('GET', f'/alunos/{int(codigo)}')
+    except ErroServico as e:
+        if e.status == 404: return None
+        raise
+
+def gravar_cadastro(cliente, dados):
+    """Mesmo retorno de banco_dados.gravar_cadastro: (codigo, None) ou (None, código do aluno com o mesmo CPF).
+
+    Para regravar um aluno existente, 'dados' traz também a 'versao' carregada; banco_dados.CadastroAlterado
+    se outro posto gravou antes.
+    """
+    try:
+        if dados.get('codigo') is None: return cliente.json('POST', '/alunos', corpo=dados)['codigo'], None
+        return cliente.json('PUT', f"/alunos/{int(dados['codigo'])}", corpo=dados)['codigo'], None
+    except ErroServico as e:
+        if e.status == 409 and 'versao_atual' in e.resposta: raise banco_dados.CadastroAlterado(dados['codigo'], e.resposta['versao_atual']) from None
+        if e.status == 409 and 'codigo' in e.resposta: return None, e.resposta['codigo']
+        if e.status == 400: raise ValueError(str(e)) from None
+        raise
+
+def alterar_cadastro(cliente, codigo, versao, alteracoes):
+    """Mesmo retorno de banco_dados.alterar_cadastro; banco_dados.CadastroAlterado se outro posto gravou antes."""
+    try: return cliente.json('PATCH', f"/alunos/{int(codigo)}", corpo={'versao': versao, 'alteracoes': alteracoes})['versao'], None
+    except ErroServico as e:
+        if e.status == 409 and 'versao_atual' in e.resposta: raise banco_dados.CadastroAlterado(codigo, e.resposta['versao_atual']) from None
+        if e.status == 409 and 'codigo' in e.resposta: return None, e.resposta['codigo']
+        if e.status == 400: raise ValueError(str(e)) from None
+        raise
+
+def pagina_alunos(cliente, apos=None, limite=200):
+    parametros = {'limite': limite}
+    if apos: parametros.update(nome=apos[0], codigo=apos[1])
+    return [tuple(linha) for linha in cliente.json('GET', '/alunos', parametros)]
+
+def pesquisar_alunos(cliente, texto, limite=200):
+    return [tuple(linha) for linha in cliente.json('GET', '/alunos/pesquisa', {'texto': texto, 'limite': limite})]
+
+def listar_alunos(cliente, curso=None, data_inicio=None, data_fim=None, area=None):
+    filtros = {'curso': curso, 'de': data_inicio, 'ate': data_fim, 'area': area}
+    with cliente.requisitar('GET', '/alunos/filtro', {chave: valor for chave, valor in filtros.items() if valor}) as resposta:
+        for linha in resposta: yield json.loads(linha)
+
+def painel(cliente):
+    dados = cliente.json('GET', '/estatisticas')
+    for chave in ('por_curso', 'por_area', 'faixas_etarias'): dados[chave] = [tuple(item) for item in dados[chave]]
+    return dados
+
+def salvar_ficha(cliente, dados, pasta='.'):
+    """Pede ao serviço o PDF da ficha dos dados do formulário e grava na pasta; devolve o caminho."""
+    with cliente.requisitar('POST', '/fichas', corpo=dados) as resposta: return _gravar_pdf(resposta, pasta)
+
+def salvar_ficha_aluno(cliente, codigo, pasta='.'):
+    """PDF da ficha do cadastro gravado, com a foto 3x4 anexada no computador do serviço; devolve o caminho."""
+    with cliente.requisitar('GET', f"/alunos/{int(codigo)}/ficha") as resposta: return _gravar_pdf(resposta, pasta)
+
+def _gravar_pdf(resposta, pasta):
+    nome = re.search(r"filename\*=UTF-8''(.+)", resposta.headers.get('Content-Disposition', ''))
+    caminho = os.path.join(pasta, os.path.basename(unquote(nome.group(1))) if nome else 'Ficha_Inscricao.pdf')
+    with open(caminho, 'wb') as arquivo: arquivo.write(resposta.read())
+    return caminho
@@ -0,0 +1,80 @@
+# =============================================================================
+# ESTATÍSTICAS DE INSCRIÇÃO (painel dos coordenadores)
+# =============================================================================
+# Uso: python estatisticas.py [--banco cadastros.db] [--json] [--recalcular]
+#
+# Os números vêm da tabela 'resumo_alunos', que os triggers mantêm atualizada a cada cadastro
+# salvo ou removido; abrir o painel não percorre a tabela de alunos. Se o banco for alterado por
+# outro programa com INSERT OR REPLACE (sqlite3, DB Browser), use --recalcular para refazer o resumo.
+import argparse
+import json
+import sys
+from datetime import date
+
+import banco_dados
+
+# Faixas etárias do painel: (rótulo, idade mínima, idade máxima)
+FAIXAS_ETARIAS = [("Até 11 anos", 0, 11), ("12 a 17 anos", 12, 17), ("18 a 29 anos", 18, 29), ("30 a 59 anos", 30, 59), ("60 anos ou mais", 60, 200)]
+SEM_INFORMACAO = "Não informado"
+
+def ler_resumo(conn):
+    resumo = {}
+    for dimensao, valor, total in conn.execute("SELECT dimensao, valor, total FROM resumo_alunos"):
+        resumo.setdefault(dimensao, {})[valor] = total
+    return resumo
+
+def idade(data_nascimento, hoje):
+    # Mesma conta de banco_dados.IDADE_SQL: desconta 1 de quem ainda não fez aniversário no ano
+    try: nascimento = date.fromisoformat(data_nascimento)
+    except ValueError: return None
+    return hoje.year - nascimento.year - ((hoje.month, hoje.day) < (nascimento.month, nascimento.day))
+
+def faixas_etarias(datas_nascimento, hoje=None):
+    hoje = hoje or date.today()
+    contagem = {rotulo: 0 for rotulo, _, _ in FAIXAS_ETARIAS}; contagem[SEM_INFORMACAO] = 0
+    for data, total in datas_nascimento.items():
+        idade_aluno = idade(data, hoje)
+        rotulo = next((rotulo for rotulo, minima, maxima in FAIXAS_ETARIAS if idade_aluno is not None and minima <= idade_aluno <= maxima), SEM_INFORMACAO)
+        contagem[rotulo] += total
+    return contagem
+
+def ordenar(contagens):
+    return sorted(((valor or SEM_INFORMACAO, total) for valor, total in contagens.items()), key=lambda item: (-item[1], item[0]))
+
+def painel(conn):
+    """Números do painel: total, alunos por curso e por área, faixas etárias, benefício e desistências."""
+    resumo = ler_resumo(conn)
+    return {
+        'total': resumo.get('total', {}).get('', 0),
+        'por_curso': ordenar(resumo.get('curso', {})),
+        'por_area': ordenar(resumo.get('area', {})),
+        'faixas_etarias': list(faixas_etarias(resumo.get('data_nascimento', {})).items()),
+        'beneficio_gov': resumo.get('beneficio_gov', {}).get('Sim', 0),
+        'desistencias': resumo.get('desistencia', {}).get('Sim', 0),
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Mostra as estatísticas de inscrição por curso, área, idade, benefício e desistência.")
+    parser.add_argument('--banco', help="arquivo do banco SQLite")
+    parser.add_argument('--json', action='store_true', help="saída em JSON")
+    parser.add_argument('--recalcular', action='store_true', help="refaz o resumo a partir da tabela de alunos antes de mostrar")
+    args = parser.parse_args(argv)
+
+    conn = banco_dados.conectar(args.banco)
+    try:
+        if args.recalcular:
+            banco_dados.recalcular_resumo(conn.cursor()); conn.commit()
+        dados = painel(conn)
+    finally: conn.close()
+
+    if args.json: print(json.dumps(dados, ensure_ascii=False, indent=2)); return 0
+    print(f"Total de alunos: {dados['total']}")
+    print(f"Recebem benefício do governo: {dados['beneficio_gov']}")
+    print(f"Desistências registradas: {dados['desistencias']}")
+    for titulo, chave in (("Alunos por curso", 'por_curso'), ("Alunos por área", 'por_area'), ("Faixa etária", 'faixas_etarias')):
+        print(f"\n{titulo}:")
+        for valor, total in dados[chave]: print(f"  {valor:<30} {total:>7}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,100 @@
+# =============================================================================
+# EXPORTAÇÃO DA TABELA DE ALUNOS (CSV, JSONL ou Parquet)
+# =============================================================================
+# Uso: python exportacao.py alunos.parquet [--curso "Teatro"] [--area "Setor Cultural"] [--de 01/01/2025] [--ate 31/12/2025]
+#
+# As linhas saem do banco em blocos (fetchmany) e são gravadas à medida que chegam, então o uso
+# de memória é o mesmo para cem ou para um milhão de cadastros. Os valores saem com os tipos do
+# banco (datas 'YYYY-mm-dd', rendas numéricas, sim/não como 1/0) e a idade calculada na consulta.
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from datetime import date
+from itertools import islice
+
+import banco_dados
+
+FORMATOS = ('csv', 'jsonl', 'parquet')
+# Linhas por grupo (row group) do arquivo Parquet
+LINHAS_POR_GRUPO = 10000
+
+def exportar_csv(registros, arquivo):
+    # utf-8-sig para o Excel reconhecer os acentos ao abrir o arquivo
+    with open(arquivo, 'w', newline='', encoding='utf-8-sig') as saida:
+        escritor = csv.DictWriter(saida, fieldnames=banco_dados.COLUNAS_COM_IDADE, extrasaction='ignore')
+        escritor.writeheader(); total = 0
+        for dados in registros: escritor.writerow(dados); total += 1
+    return total
+
+def exportar_jsonl(registros, arquivo):
+    with open(arquivo, 'w', encoding='utf-8') as saida:
+        total = 0
+        for dados in registros:
+            registro = {col: dados.get(col) for col in banco_dados.COLUNAS_COM_IDADE}
+            for col in banco_dados.COLUNAS_SIM_NAO:
+                if registro[col] is not None: registro[col] = bool(registro[col])
+            saida.write(json.dumps(registro, ensure_ascii=False)); saida.write('\n'); total += 1
+    return total
+
+def exportar_parquet(registros, arquivo):
+    # Dependência opcional, necessária apenas para o formato colunar
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError: raise RuntimeError("Para exportar em Parquet instale o pacote 'pyarrow' (pip install pyarrow).")
+    esquema = pa.schema([pa.field(col, tipo_parquet(pa, col)) for col in banco_dados.COLUNAS_COM_IDADE])
+    total = 0
+    with pq.ParquetWriter(arquivo, esquema) as escritor:
+        while True:
+            bloco = list(islice(registros, LINHAS_POR_GRUPO))
+            if not bloco: break
+            colunas = {col: [dados.get(col) for dados in bloco] for col in banco_dados.COLUNAS_COM_IDADE}
+            for col in banco_dados.COLUNAS_DATA: colunas[col] = [date.fromisoformat(valor) if valor else None for valor in colunas[col]]
+            for col in banco_dados.COLUNAS_SIM_NAO: colunas[col] = [None if valor is None else bool(valor) for valor in colunas[col]]
+            escritor.write_table(pa.Table.from_pydict(colunas, schema=esquema)); total += len(bloco)
+    return total
+
+def tipo_parquet(pa, coluna):
+    if coluna in ('codigo', 'idade') or coluna in banco_dados.COLUNAS_QUANTIDADE: return pa.int64()
+    if coluna in banco_dados.COLUNAS_VALOR: return pa.float64()
+    if coluna in banco_dados.COLUNAS_SIM_NAO: return pa.bool_()
+    if coluna in banco_dados.COLUNAS_DATA: return pa.date32()
+    return pa.string()
+
+EXPORTADORES = {'csv': exportar_csv, 'jsonl': exportar_jsonl, 'parquet': exportar_parquet}
+
+def exportar(conn, arquivo, formato=None, curso=None, area=None, data_inicio=None, data_fim=None):
+    """Grava os alunos filtrados em 'arquivo' e devolve a quantidade exportada."""
+    formato = formato or os.path.splitext(arquivo)[1].lstrip('.').lower()
+    if formato not in EXPORTADORES: raise ValueError(f"Formato '{formato}' não suportado; use {', '.join(FORMATOS)}.")
+    registros = banco_dados.listar_alunos(conn, curso, data_inicio, data_fim, area)
+    return EXPORTADORES[formato](registros, arquivo)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Exporta os cadastros de alunos para CSV, JSONL ou Parquet.")
+    parser.add_argument('arquivo', help="arquivo de saída (o formato vem da extensão, se --formato não for usado)")
+    parser.add_argument('--formato', choices=FORMATOS)
+    parser.add_argument('--banco', help="arquivo do banco SQLite")
+    parser.add_argument('--curso', help="exporta apenas os alunos deste curso")
+    parser.add_argument('--area', help="exporta apenas os alunos desta área")
+    parser.add_argument('--de', dest='data_inicio', help="data de inscrição inicial (dd/mm/aaaa)")
+    parser.add_argument('--ate', dest='data_fim', help="data de inscrição final (dd/mm/aaaa)")
+    args = parser.parse_args(argv)
+
+    for data in (args.data_inicio, args.data_fim):
+        if data:
+            try: banco_dados.data_iso(data)
+            except ValueError: parser.error("as datas devem estar no formato dd/mm/aaaa")
+    conn = banco_dados.conectar(args.banco)
+    inicio = time.perf_counter()
+    try: total = exportar(conn, args.arquivo, args.formato, args.curso, args.area, args.data_inicio, args.data_fim)
+    except (ValueError, RuntimeError, OSError) as e: print(f"Não foi possível exportar: {e}", file=sys.stderr); return 1
+    finally: conn.close()
+    print(f"{total} aluno(s) exportado(s) para '{args.arquivo}' em {time.perf_counter() - inicio:.2f}s.")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,183 @@
+# =============================================================================
+# RENDERIZAÇÃO DA FICHA DE INSCRIÇÃO EM PDF (sem dependência da interface Tk)
+# =============================================================================
+# Recebe um cadastro como dict e devolve os bytes do PDF: renderizar_ficha(dados) -> bytes
+import hashlib
+import io
+import json
+import os
+import threading
+from collections import OrderedDict
+
+from reportlab.pdfgen import canvas
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.units import cm
+from reportlab.lib.styles import ParagraphStyle
+from reportlab.lib.utils import ImageReader
+from reportlab.platypus import Paragraph
+from reportlab.lib.colors import black
+
+import banco_dados
+import instrumentacao
+
+# A logo fica ao lado do programa, para funcionar mesmo quando o comando roda de outra pasta
+CAMINHO_LOGO = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'logo.png')
+# Largura (px) da logo embutida: ~300 dpi para os 4 cm em que ela é desenhada
+LARGURA_LOGO_PX = 600
+# Quantidade de fichas renderizadas mantidas em memória, indexadas pelo hash do cadastro
+TAMANHO_CACHE = 128
+# Foto 3x4 no canto superior direito (a miniatura 'ficha' de anexos.py já vem nesse formato)
+LARGURA_FOTO, ALTURA_FOTO = 2.4*cm, 3.2*cm
+
+# Estilo dos parágrafos, criado uma única vez e reaproveitado em todas as fichas
+ESTILO_PARAGRAFO = ParagraphStyle(name='Normal', fontName='Helvetica', fontSize=9, leading=12)
+
+_logo = None
+_cache_fichas = OrderedDict()
+# O serviço HTTP renderiza fichas em várias threads ao mesmo tempo
+_trava_cache = threading.Lock()
+
+def carregar_logo():
+    # Decodifica e reduz a logo só na primeira ficha do processo; o mesmo ImageReader vira
+    # um único XObject de imagem em cada documento, compartilhado entre as páginas
+    global _logo
+    if _logo is None:
+        from PIL import Image
+        imagem = Image.open(CAMINHO_LOGO)
+        if imagem.width > LARGURA_LOGO_PX:
+            imagem = imagem.resize((LARGURA_LOGO_PX, round(imagem.height * LARGURA_LOGO_PX / imagem.width)), Image.LANCZOS)
+        _logo = ImageReader(imagem)
+    return _logo
+
+def normalizar_dados(dados):
+    # Registros lidos do banco têm NULL, datas ISO, números e 1/0; a ficha usa os textos da tela e código com 4 dígitos
+    dados = banco_dados.para_exibicao(dados)
+    if dados.get('codigo'): dados['codigo'] = dados['codigo'].zfill(4)
+    return dados
+
+def nome_arquivo_ficha(dados):
+    dados = normalizar_dados(dados)
+    nome_aluno = dados.get('nome_completo') or 'aluno_sem_nome'; codigo_aluno = dados.get('codigo') or '0000'
+    return f"Ficha_Inscricao_{codigo_aluno}_{nome_aluno.replace(' ', '_')}.pdf"
+
+def chave_cache(dados, foto=None):
+    # A foto entra pelo caminho: as miniaturas têm o hash do conteúdo no nome
+    return hashlib.sha256(json.dumps([dados, foto], sort_keys=True, ensure_ascii=False).encode('utf-8')).hexdigest()
+
+def renderizar_ficha(dados, foto=None):
+    """Devolve o PDF da ficha como bytes; cadastros idênticos reaproveitam a renderização anterior.
+
+    'foto' é o caminho da foto 3x4 já reduzida (anexos.miniatura_da_ficha), ou None.
+    """
+    dados = normalizar_dados(dados); chave = chave_cache(dados, foto)
+    with _trava_cache:
+        pdf = _cache_fichas.get(chave)
+        if pdf is not None:
+            _cache_fichas.move_to_end(chave); return pdf
+    # Com o diagnóstico ligado, cada fase (logo, parágrafos, gravação) aparece no painel
+    with instrumentacao.medir('pdf: ficha'):
+        buffer = io.BytesIO()
+        c = canvas.Canvas(buffer, pagesize=A4)
+        desenhar_ficha(c, dados, foto)
+        with instrumentacao.medir('pdf: salvar'): c.save()
+    with _trava_cache:
+        pdf = _cache_fichas[chave] = buffer.getvalue()
+        if len(_cache_fichas) > TAMANHO_CACHE: _cache_fichas.popitem(last=False)
+    return pdf
+
+def salvar_ficha(dados, caminho, foto=None):
+    with open(caminho, 'wb') as arquivo: arquivo.write(renderizar_ficha(dados, foto))
+    return caminho
+
+def desenhar_ficha(c, dados, foto=None):
+    dados = normalizar_dados(dados)
+    largura, altura = A4
+
+    MARGEM_X = 2*cm; MARGEM_Y_SUPERIOR = 27.5*cm; MARGEM_INFERIOR = 2.5*cm
+    LARGURA_UTIL = largura - 2*MARGEM_X
+    ESPACAMENTO_LINHA, ESPACAMENTO_SECAO = 0.6*cm, 1*cm
+    y_atual = MARGEM_Y_SUPERIOR
+
+    def check_page_break():
+        nonlocal y_atual
+        if y_atual < MARGEM_INFERIOR:
+            c.showPage(); y_atual = MARGEM_Y_SUPERIOR
+            return True
+        return False
+
+    def desenha_titulo_secao(texto):
+        nonlocal y_atual
+        if check_page_break(): y_atual -= 0.5*cm
+        y_atual -= ESPACAMENTO_SECAO; c.setFont("Helvetica-Bold", 11); c.setFillColor(black)
+        c.drawString(MARGEM_X, y_atual, texto.upper()); y_atual -= 0.1*cm
+        c.line(MARGEM_X, y_atual, MARGEM_X + LARGURA_UTIL, y_atual); y_atual -= ESPACAMENTO_LINHA*1.5
+
+    def desenha_campo(label, valor, x_offset: float = 0.0):
+        nonlocal y_atual
+        if check_page_break(): desenha_titulo_secao("Continuação da Ficha")
+        c.setFont("Helvetica-Bold", 9); c.drawString(MARGEM_X + x_offset, y_atual, f"{label}:")
+        c.setFont("Helvetica", 9); c.drawString(MARGEM_X + x_offset + 3.5*cm, y_atual, str(dados.get(valor, '')))
+
+    def desenha_paragrafo(texto):
+        nonlocal y_atual; check_page_break()
+        p = Paragraph(texto, ESTILO_PARAGRAFO)
+        with instrumentacao.medir('pdf: parágrafo'): largura_p, altura_p = p.wrapOn(c, LARGURA_UTIL, altura)
+        if y_atual - altura_p < MARGEM_INFERIOR: c.showPage(); y_atual = MARGEM_Y_SUPERIOR; desenha_titulo_secao("Continuação da Ficha")
+        y_atual -= altura_p; p.drawOn(c, MARGEM_X, y_atual); y_atual -= ESPACAMENTO_LINHA
+
+    try:
+        with instrumentacao.medir('pdf: logo'): c.drawImage(carregar_logo(), MARGEM_X, y_atual-1.2*cm, width=4*cm, height=2.5*cm, preserveAspectRatio=True, anchor='n')
+    except: c.drawString(MARGEM_X, y_atual-0.5*cm, "[Logo]")
+    c.setFont("Helvetica-Bold", 18); c.drawCentredString(largura/2, y_atual, "FICHA DE INSCRIÇÃO"); y_atual -= 0.5*cm
+    c.line(MARGEM_X, y_atual, LARGURA_UTIL + MARGEM_X, y_atual)
+
+    desenha_titulo_secao("Ficha de Inscrição")
+    desenha_campo("Código", "codigo"); desenha_campo("Data da Inscrição", "data_inscricao", x_offset=8.5*cm); y_atual -= ESPACAMENTO_LINHA
+    desenha_campo("Nome Completo", "nome_completo"); y_atual -= ESPACAMENTO_LINHA
+    desenha_campo("Curso", "curso"); desenha_campo("Área", "area", x_offset=8.5*cm); y_atual -= ESPACAMENTO_LINHA
+    desenha_campo("Data de Nascimento", "data_nascimento"); desenha_campo("Idade", "idade", x_offset=8.5*cm); y_atual -= ESPACAMENTO_LINHA
+    desenha_campo("CPF", "cpf"); desenha_campo("Sexo", "sexo", x_offset=8.5*cm); y_atual -= ESPACAMENTO_LINHA
+    desenha_campo("Estado Civil", "estado_civil")
+    if foto:
+        # Desenhada depois do cabeçalho e da primeira seção, por cima das linhas que passam pelo canto
+        with instrumentacao.medir('pdf: foto'):
+            x_foto, y_foto = largura - MARGEM_X - LARGURA_FOTO, MARGEM_Y_SUPERIOR + 1.3*cm - ALTURA_FOTO
+            c.drawImage(foto, x_foto, y_foto, width=LARGURA_FOTO, height=ALTURA_FOTO, preserveAspectRatio=True)
+            c.rect(x_foto, y_foto, LARGURA_FOTO, ALTURA_FOTO)
+
+    desenha_titulo_secao("Endereço e Contato")
+    desenha_campo("CEP", "cep"); desenha_campo("Rua", "rua", x_offset=5*cm); y_atual -= ESPACAMENTO_LINHA
+    desenha_campo("Número", "numero"); desenha_campo("Complemento", "complemento", x_offset=5*cm); y_atual -= ESPACAMENTO_LINHA
+    desenha_campo("Ponto de Referência", "ponto_referencia"); y_atual -= ESPACAMENTO_LINHA
+    desenha_campo("Contato 1", "contato1"); desenha_campo("Contato 2", "contato2", x_offset=8.5*cm)
+
+    desenha_titulo_secao("Dados Escolares")
+    desenha_campo("Escola", "escola"); desenha_campo("Frequenta?", "frequenta_escola", x_offset=10*cm); y_atual -= ESPACAMENTO_LINHA
+    desenha_campo("Série", "serie"); desenha_campo("Ensino", "ensino", x_offset=8.5*cm); y_atual -= ESPACAMENTO_LINHA
+    desenha_campo("Trabalha?", "trabalha"); desenha_campo("Profissão", "profissao", x_offset=8.5*cm); y_atual -= ESPACAMENTO_LINHA
+    desenha_campo("Renda Mensal", "renda_mensal")
+
+    desenha_titulo_secao("Dados da Residência")
+    desenha_campo("Nome do Pai", "nome_pai"); y_atual -= ESPACAMENTO_LINHA
+    desenha_campo("Nome da Mãe", "nome_mae"); y_atual -= ESPACAMENTO_LINHA
+    desenha_campo("N° de Irmãos", "num_irmaos"); desenha_campo("Pessoas na Residência", "pessoas_residencia", x_offset=8.5*cm); y_atual -= ESPACAMENTO_LINHA
+    desenha_campo("N° de Filhos", "num_filhos"); desenha_campo("Renda Familiar", "renda_familiar", x_offset=8.5*cm); y_atual -= ESPACAMENTO_LINHA
+    desenha_campo("Nome do Cônjuge", "nome_conjuge"); desenha_campo("Renda do Cônjuge", "renda_conjuge", x_offset=8.5*cm); y_atual -= ESPACAMENTO_LINHA
+    check_texto = f"Mora com: {'Pais' if dados.get('mora_pais')=='Sim' else ''} {'Mãe/Pai' if dados.get('mora_mae_pai')=='Sim' else ''} {'Parentes' if dados.get('mora_parentes')=='Sim' else ''} {'Cônjuge' if dados.get('mora_conjuge')=='Sim' else ''}"
+    c.setFont("Helvetica-Bold", 9); c.drawString(MARGEM_X, y_atual, "Configuração de Moradia:"); c.setFont("Helvetica", 9); c.drawString(MARGEM_X + 4*cm, y_atual, check_texto)
+    y_atual -= ESPACAMENTO_LINHA; desenha_campo("Recebe Benefício?", "beneficio_gov"); desenha_campo("Qual?", "qual_beneficio", x_offset=8.5*cm); y_atual -= ESPACAMENTO_LINHA
+    c.setFont("Helvetica-Bold", 9); c.drawString(MARGEM_X, y_atual, "Descrição Familiar:"); y_atual -= 0.4*cm
+    desenha_paragrafo(dados.get('desc_familiar', ''))
+
+    desenha_titulo_secao("Documentos Entregues")
+    doc_texto = f"ID: {'(X)' if dados.get('doc_id')=='Sim' else '( )'} | CPF: {'(X)' if dados.get('doc_cpf')=='Sim' else '( )'} | Residência: {'(X)' if dados.get('doc_residencia')=='Sim' else '( )'} | Vacina: {'(X)' if dados.get('doc_vacina')=='Sim' else '( )'} | Foto 3x4: {'(X)' if dados.get('doc_foto')=='Sim' else '( )'}"
+    c.setFont("Helvetica", 9); c.drawString(MARGEM_X, y_atual, doc_texto)
+
+    desenha_titulo_secao("Observações"); desenha_paragrafo(dados.get('observacao', 'Nenhuma observação.'))
+    desenha_titulo_secao("Termo de Autorização de Imagem")
+    desenha_paragrafo("Autorizo, de forma gratuita, a utilização da minha imagem e voz para fins de divulgação institucional, conforme Lei de Direitos Autorais (Lei nº 9.610/1998).")
+    y_atual -= ESPACAMENTO_LINHA; c.setFont("Helvetica-Bold", 10); c.drawString(MARGEM_X, y_atual, f"[{'X' if dados.get('aceite_declaracao')=='Sim' else ' '}] LI E CONCORDO COM OS TERMOS")
+
+    y_atual -= 3*cm; check_page_break()
+    c.line(largura/2 - 6*cm, y_atual, largura/2 + 6*cm, y_atual)
+    c.drawCentredString(largura/2, y_atual-0.4*cm, "Assinatura do Aluno ou Responsável")
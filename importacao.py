@@ -0,0 +1,150 @@
+# =============================================================================
+# IMPORTAÇÃO EM MASSA DE PRÉ-INSCRIÇÕES (CSV ou XLSX)
+# =============================================================================
+# Uso: python importacao.py pre_inscricoes.xlsx [--banco cadastros.db] [--lote 5000] [--simular]
+#
+# A primeira linha da planilha traz os nomes das colunas da tabela 'alunos' ("Nome Completo" ou
+# "nome_completo", com ou sem acento). Cada aluno importado recebe um código novo; uma coluna
+# 'codigo' na planilha é ignorada para nunca sobrescrever cadastros existentes.
+import argparse
+import csv
+import os
+import sqlite3
+import sys
+import time
+import unicodedata
+from datetime import date, datetime
+
+import banco_dados
+
+# Linhas gravadas por transação
+TAMANHO_LOTE = 5000
+# Limite de parâmetros por consulta 'IN (...)' na verificação de CPFs
+MAX_PARAMETROS = 900
+
+VALORES_SIM = {'sim', 's', 'x', '1', 'true', 'verdadeiro'}
+VALORES_NAO = {'não', 'nao', 'n', '0', 'false', 'falso'}
+CONECTIVOS = {'de', 'da', 'do', 'das', 'dos'}
+
+def nome_coluna(cabecalho):
+    # "Nome Completo" / "Data de Nascimento" / "Nome da Mãe" -> "nome_completo" / "data_nascimento" / "nome_mae"
+    texto = unicodedata.normalize('NFKD', str(cabecalho or '')).encode('ascii', 'ignore').decode()
+    return '_'.join(p for p in texto.strip().lower().replace('-', ' ').replace('_', ' ').split() if p not in CONECTIVOS)
+
+def valor_texto(valor, coluna):
+    # Planilhas trazem números e datas tipados; aqui tudo vira o texto do formulário, que para_banco converte
+    if valor is None: return ''
+    if isinstance(valor, (datetime, date)): return valor.strftime('%d/%m/%Y')
+    if isinstance(valor, float) and valor.is_integer(): valor = int(valor)
+    texto = str(valor).strip()
+    if coluna == 'cpf' and isinstance(valor, int): texto = texto.zfill(11)
+    # Outros textos ("talvez", "sin") seguem como estão e a linha é recusada por validar_cadastro, como no formulário
+    if coluna in banco_dados.COLUNAS_SIM_NAO:
+        if texto.lower() in VALORES_SIM: texto = 'Sim'
+        elif texto.lower() in VALORES_NAO: texto = 'Não'
+    return texto
+
+def ler_linhas(caminho):
+    """Percorre a planilha sem carregá-la inteira: gera (número da linha, dict com as colunas reconhecidas)."""
+    extensao = os.path.splitext(caminho)[1].lower()
+    if extensao in ('.xlsx', '.xlsm'):
+        try: from openpyxl import load_workbook
+        except ImportError: raise RuntimeError("Para importar planilhas XLSX instale o pacote 'openpyxl' (pip install openpyxl).")
+        livro = load_workbook(caminho, read_only=True, data_only=True)
+        try:
+            linhas = livro.active.iter_rows(values_only=True)
+            yield from _linhas_com_cabecalho(linhas)
+        finally: livro.close()
+    else:
+        with open(caminho, newline='', encoding='utf-8-sig') as arquivo:
+            # O separador é o que mais aparece no cabeçalho: o Excel em português grava ';', outros ',' ou tabulação
+            cabecalho = arquivo.readline(); arquivo.seek(0)
+            separador = max(';,\t', key=cabecalho.count)
+            yield from _linhas_com_cabecalho(csv.reader(arquivo, delimiter=separador))
+
+def _linhas_com_cabecalho(linhas):
+    originais = next(linhas, [])
+    cabecalho = [nome_coluna(c) for c in originais]
+    colunas = [(i, c) for i, c in enumerate(cabecalho) if c in banco_dados.COLUNAS and c != 'codigo']
+    ignoradas = [str(original).strip() for original, c in zip(originais, cabecalho) if c and c not in banco_dados.COLUNAS]
+    if ignoradas: print(f"Aviso: coluna(s) sem correspondente no cadastro, ignorada(s): {', '.join(ignoradas)}", file=sys.stderr)
+    if not any(c in ('nome_completo', 'cpf', 'curso') for _, c in colunas):
+        raise ValueError("o cabeçalho não tem as colunas Nome Completo, CPF ou Curso (confira a primeira linha e o separador).")
+    for numero, linha in enumerate(linhas, start=2):
+        if not any(v not in (None, '') for v in linha): continue
+        yield numero, {coluna: valor_texto(linha[i] if i < len(linha) else None, coluna) for i, coluna in colunas}
+
+def preparar(dados, hoje):
+    # Inscrição sem data recebe a de hoje; os textos da planilha são convertidos para os tipos do banco
+    dados['data_inscricao'] = dados.get('data_inscricao') or hoje
+    return banco_dados.para_banco(dados)
+
+def cpfs_existentes(conn, cpfs):
+    # Uma consulta por bloco de CPFs, resolvida pelo índice idx_cpf
+    encontrados = set(); cpfs = list(cpfs)
+    for inicio in range(0, len(cpfs), MAX_PARAMETROS):
+        bloco = cpfs[inicio:inicio + MAX_PARAMETROS]
+        encontrados.update(cpf for (cpf,) in conn.execute(f"SELECT cpf FROM alunos WHERE cpf IN ({', '.join('?' * len(bloco))})", bloco))
+    return encontrados
+
+def importar(conn, linhas, tamanho_lote=TAMANHO_LOTE, simular=False):
+    """Valida e grava as linhas em transações de 'tamanho_lote'.
+
+    Retorna (importados, erros), onde erros é uma lista de (número da linha, mensagem).
+    """
+    importados, erros, cpfs_vistos = 0, [], set()
+    hoje = datetime.now().strftime('%d/%m/%Y'); lote = []
+
+    def gravar(lote):
+        cpfs_duplicados = cpfs_existentes(conn, (dados['cpf'] for _, dados in lote))
+        validos = []
+        for numero, dados in lote:
+            if dados['cpf'] in cpfs_duplicados: erros.append((numero, f"CPF '{dados['cpf']}' já cadastrado."))
+            else: validos.append(dados)
+        if simular or not validos: return len(validos)
+        # BEGIN IMMEDIATE reserva a escrita antes de calcular os códigos, evitando colisão com outros postos
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            codigo = banco_dados.proximo_codigo(conn)
+            for deslocamento, dados in enumerate(validos): dados['codigo'] = codigo + deslocamento
+            conn.executemany(f"INSERT INTO alunos ({', '.join(banco_dados.COLUNAS)}) VALUES ({', '.join('?' * len(banco_dados.COLUNAS))})",
+                             ([dados.get(col) for col in banco_dados.COLUNAS] for dados in validos))
+            conn.commit()
+        except Exception:
+            conn.rollback(); raise
+        return len(validos)
+
+    for numero, dados in linhas:
+        erro = banco_dados.validar_cadastro(dados)
+        if erro: erros.append((numero, erro)); continue
+        if dados['cpf'] in cpfs_vistos: erros.append((numero, f"CPF '{dados['cpf']}' repetido na planilha.")); continue
+        cpfs_vistos.add(dados['cpf']); lote.append((numero, preparar(dados, hoje)))
+        if len(lote) >= tamanho_lote: importados += gravar(lote); lote = []
+    if lote: importados += gravar(lote)
+    return importados, erros
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Importa pré-inscrições de uma planilha CSV ou XLSX para o banco de alunos.")
+    parser.add_argument('arquivo', help="planilha .csv ou .xlsx com cabeçalho")
+    parser.add_argument('--banco', help="arquivo do banco SQLite")
+    parser.add_argument('--lote', type=int, default=TAMANHO_LOTE, help="linhas gravadas por transação")
+    parser.add_argument('--simular', action='store_true', help="apenas valida, sem gravar nada")
+    args = parser.parse_args(argv)
+
+    try: conn = banco_dados.conectar(args.banco)
+    except sqlite3.Error as e: print(f"Não foi possível abrir o banco: {e}", file=sys.stderr); return 1
+    # Transações controladas manualmente (BEGIN IMMEDIATE / commit) em importar()
+    conn.isolation_level = None
+    inicio = time.perf_counter()
+    try: importados, erros = importar(conn, ler_linhas(args.arquivo), args.lote, args.simular)
+    except (OSError, RuntimeError, ValueError, csv.Error, sqlite3.Error) as e: print(f"Não foi possível importar: {e}", file=sys.stderr); return 1
+    finally: conn.close()
+    duracao = time.perf_counter() - inicio
+
+    for numero, mensagem in sorted(erros): print(f"Linha {numero}: {mensagem}", file=sys.stderr)
+    acao = "válida(s) (simulação, nada foi gravado)" if args.simular else "importada(s)"
+    print(f"{importados} linha(s) {acao}, {len(erros)} com erro, em {duracao:.2f}s ({(importados + len(erros)) / duracao if duracao else 0:.0f} linhas/s).")
+    return 1 if erros else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
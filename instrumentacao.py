@@ -0,0 +1,166 @@
+# =============================================================================
+# DIAGNÓSTICO DE DESEMPENHO: TEMPO DAS CONSULTAS, DAS FICHAS E DA TELA
+# =============================================================================
+# Desligado por padrão; ativado com programa_cadastro.py --diagnostico (ou servico.py --diagnostico).
+# Cada medição vai para um log JSON rotativo (uma linha por evento) e para o painel "Diagnóstico",
+# que mostra p50/p95 por operação e as últimas consultas lentas com o plano do SQLite.
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+# Log ao lado do programa; ao chegar no tamanho máximo vira diagnostico.log.1 (até 3 arquivos antigos)
+CAMINHO_LOG_PADRAO = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'diagnostico.log')
+TAMANHO_MAXIMO_LOG = 5 * 1024 * 1024
+ARQUIVOS_ANTIGOS_LOG = 3
+# Consultas a partir deste tempo têm o plano (EXPLAIN QUERY PLAN) registrado
+LIMITE_LENTA_MS = 50
+# Medições mantidas por operação para calcular os percentis, e consultas lentas mostradas no painel
+AMOSTRAS_POR_OPERACAO = 2000
+CONSULTAS_LENTAS = 50
+
+ATIVO = False
+_trava = threading.Lock()
+_amostras = {}
+_consultas_lentas = deque(maxlen=CONSULTAS_LENTAS)
+_log = None
+_limite_lenta_ms = LIMITE_LENTA_MS
+
+def ativar(caminho_log=None, limite_lenta_ms=LIMITE_LENTA_MS):
+    global ATIVO, _log, _limite_lenta_ms
+    import logging
+    from logging.handlers import RotatingFileHandler
+    _log = logging.getLogger('cadastro.diagnostico'); _log.setLevel(logging.INFO); _log.propagate = False
+    if not _log.handlers:
+        arquivo = RotatingFileHandler(caminho_log or CAMINHO_LOG_PADRAO, maxBytes=TAMANHO_MAXIMO_LOG, backupCount=ARQUIVOS_ANTIGOS_LOG, encoding='utf-8')
+        arquivo.setFormatter(logging.Formatter('%(message)s')); _log.addHandler(arquivo)
+    _limite_lenta_ms = limite_lenta_ms; ATIVO = True
+
+def registrar(operacao, segundos, **detalhes):
+    """Guarda uma medição (operação, duração) para o painel e escreve a linha no log."""
+    ms = segundos * 1000
+    with _trava:
+        amostras = _amostras.get(operacao)
+        if amostras is None: amostras = _amostras[operacao] = deque(maxlen=AMOSTRAS_POR_OPERACAO)
+        amostras.append(ms)
+        if detalhes.get('plano') is not None: _consultas_lentas.append({'quando': time.strftime('%H:%M:%S'), 'operacao': operacao, 'ms': ms, **detalhes})
+    if _log: _log.info(json.dumps({'ts': round(time.time(), 3), 'thread': threading.current_thread().name, 'operacao': rotulo(operacao), 'ms': round(ms, 3), **detalhes}, ensure_ascii=False, default=str))
+
+@contextmanager
+def medir(operacao, **detalhes):
+    if not ATIVO:
+        yield; return
+    inicio = time.perf_counter()
+    try: yield
+    finally: registrar(operacao, time.perf_counter() - inicio, **detalhes)
+
+def rotulo(operacao, largura=90):
+    # Só para exibir: consultas sobre SELECT_ALUNOS começam iguais, então o fim (WHERE/ORDER BY) continua visível
+    if len(operacao) <= largura: return operacao
+    return operacao[:largura * 2 // 3 - 2] + ' … ' + operacao[-(largura // 3 - 1):]
+
+def percentil(valores, p):
+    return valores[min(len(valores) - 1, int(len(valores) * p))] if valores else 0.0
+
+def resumo():
+    """(operação, quantidade, p50, p95, máximo) de cada operação medida, da mais lenta (p95) para a mais rápida."""
+    with _trava: copias = {operacao: sorted(amostras) for operacao, amostras in _amostras.items()}
+    linhas = [(operacao, len(v), percentil(v, 0.5), percentil(v, 0.95), v[-1]) for operacao, v in copias.items() if v]
+    return sorted(linhas, key=lambda linha: -linha[3])
+
+def consultas_lentas():
+    with _trava: return list(_consultas_lentas)
+
+def limpar():
+    with _trava: _amostras.clear(); _consultas_lentas.clear()
+
+# =============================================================================
+# CONEXÃO SQLITE INSTRUMENTADA (banco_dados.conectar usa quando o diagnóstico está ativo)
+# =============================================================================
+def nome_consulta(sql):
+    # Agrupa consultas iguais: espaços compactados e listas "?, ?, ?" de tamanhos diferentes unificadas.
+    # O SQL inteiro é a chave; cortá-lo juntaria consultas com o mesmo começo (ver rotulo)
+    sql = re.sub(r'\s+', ' ', sql).strip()
+    return 'sql: ' + re.sub(r'\?(\s*,\s*\?)+', '?…', sql)
+
+class CursorInstrumentado(sqlite3.Cursor):
+    """Soma o tempo do execute e das leituras de cada consulta e conta as linhas devolvidas."""
+    _consulta = None
+
+    def execute(self, sql, parametros=()):
+        self._finalizar(); inicio = time.perf_counter()
+        try: super().execute(sql, parametros)
+        finally: self._consulta = [sql, parametros, time.perf_counter() - inicio, 0]
+        # Sem linhas a ler (INSERT, UPDATE, DDL): a medição termina aqui
+        if self.description is None: self._finalizar(self.rowcount)
+        return self
+
+    def executemany(self, sql, sequencia):
+        self._finalizar(); inicio = time.perf_counter()
+        try: return super().executemany(sql, sequencia)
+        finally: registrar(nome_consulta(sql), time.perf_counter() - inicio, sql=sql, linhas=self.rowcount, lote=True)
+
+    def _ler(self, leitura, *args):
+        inicio = time.perf_counter()
+        try: return leitura(*args)
+        finally:
+            if self._consulta: self._consulta[2] += time.perf_counter() - inicio
+
+    def fetchone(self):
+        linha = self._ler(super().fetchone)
+        if linha is None: self._finalizar()
+        elif self._consulta: self._consulta[3] += 1
+        return linha
+
+    def fetchmany(self, size=None):
+        linhas = self._ler(super().fetchmany, size or self.arraysize)
+        if self._consulta: self._consulta[3] += len(linhas)
+        if len(linhas) < (size or self.arraysize): self._finalizar()
+        return linhas
+
+    def fetchall(self):
+        linhas = self._ler(super().fetchall)
+        if self._consulta: self._consulta[3] += len(linhas)
+        self._finalizar()
+        return linhas
+
+    def __next__(self):
+        try: linha = self._ler(super().__next__)
+        except StopIteration: self._finalizar(); raise
+        if self._consulta: self._consulta[3] += 1
+        return linha
+
+    def close(self):
+        self._finalizar(); super().close()
+
+    def __del__(self):
+        try: self._finalizar()
+        except Exception: pass
+
+    def _finalizar(self, linhas=None):
+        if not self._consulta: return
+        sql, parametros, segundos, lidas = self._consulta; self._consulta = None
+        detalhes = {'sql': sql, 'linhas': lidas if linhas is None else linhas}
+        if segundos * 1000 >= _limite_lenta_ms and re.match(r'\s*(SELECT|WITH|INSERT|UPDATE|DELETE)\b', sql, re.IGNORECASE):
+            detalhes['plano'] = plano_consulta(self.connection, sql, parametros)
+        registrar(nome_consulta(sql), segundos, **detalhes)
+
+def plano_consulta(conn, sql, parametros):
+    # Cursor comum (não instrumentado), para a consulta do plano não ser medida também
+    try: return [linha[-1] for linha in sqlite3.Cursor(conn).execute(f"EXPLAIN QUERY PLAN {sql}", parametros)]
+    except sqlite3.Error as e: return [f"plano indisponível: {e}"]
+
+class ConexaoInstrumentada(sqlite3.Connection):
+    def cursor(self, factory=None):
+        return super().cursor(factory or CursorInstrumentado)
+
+    # Connection.execute não passa por cursor(), por isso é refeito aqui
+    def execute(self, sql, parametros=()):
+        return self.cursor().execute(sql, parametros)
+
+    def executemany(self, sql, sequencia):
+        return self.cursor().executemany(sql, sequencia)
@@ -0,0 +1,75 @@
+# =============================================================================
+# GERAÇÃO EM LOTE DAS FICHAS DE INSCRIÇÃO (turmas inteiras ou períodos)
+# =============================================================================
+# Uso: python lote_pdf.py --curso "Violão" --de 01/01/2025 --ate 31/12/2025 --saida fichas --mesclar turma.pdf
+import argparse
+import multiprocessing
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import banco_dados
+import ficha_pdf
+
+def _renderizar(dados, pasta_saida):
+    # Executada nos processos de trabalho: cada um desenha e grava uma ficha
+    return ficha_pdf.salvar_ficha(dados, os.path.join(pasta_saida, ficha_pdf.nome_arquivo_ficha(dados)))
+
+def gerar_lote(registros, pasta_saida, processos=None, arquivo_mesclado=None, progresso=None):
+    """Gera uma ficha por registro em 'pasta_saida' usando um pool de processos.
+
+    'progresso(feitos, total, caminho)' é chamado a cada ficha concluída. Se 'arquivo_mesclado'
+    for informado, as fichas também são reunidas num único PDF. Retorna (caminhos, erros).
+    """
+    registros = list(registros); total = len(registros)
+    os.makedirs(pasta_saida, exist_ok=True)
+    caminhos, erros = [None] * total, []
+    # 'spawn' evita duplicar o estado da interface Tk quando o lote é iniciado pelo programa
+    with ProcessPoolExecutor(max_workers=processos, mp_context=multiprocessing.get_context('spawn')) as executor:
+        futuros = {executor.submit(_renderizar, dados, pasta_saida): i for i, dados in enumerate(registros)}
+        for feitos, futuro in enumerate(as_completed(futuros), start=1):
+            i = futuros[futuro]
+            try: caminhos[i] = futuro.result()
+            except Exception as e: erros.append((registros[i].get('codigo'), str(e)))
+            if progresso: progresso(feitos, total, caminhos[i])
+    caminhos = [c for c in caminhos if c]
+    if arquivo_mesclado and caminhos: mesclar_pdfs(caminhos, arquivo_mesclado)
+    return caminhos, erros
+
+def mesclar_pdfs(caminhos, destino):
+    # Dependência opcional, necessária apenas para reunir as fichas num único arquivo
+    try: from pypdf import PdfWriter
+    except ImportError: raise RuntimeError("Para mesclar as fichas instale o pacote 'pypdf' (pip install pypdf).")
+    escritor = PdfWriter()
+    for caminho in caminhos: escritor.append(caminho)
+    with open(destino, 'wb') as arquivo: escritor.write(arquivo)
+    return destino
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Gera as fichas de inscrição em lote a partir do banco de alunos.")
+    parser.add_argument('--banco', default=banco_dados.CAMINHO_PADRAO, help="arquivo do banco SQLite")
+    parser.add_argument('--curso', help="gera apenas os alunos deste curso")
+    parser.add_argument('--de', dest='data_inicio', help="data de inscrição inicial (dd/mm/aaaa)")
+    parser.add_argument('--ate', dest='data_fim', help="data de inscrição final (dd/mm/aaaa)")
+    parser.add_argument('--saida', default='fichas', help="pasta onde as fichas serão gravadas")
+    parser.add_argument('--mesclar', metavar='ARQUIVO', help="também reúne todas as fichas neste PDF")
+    parser.add_argument('--processos', type=int, help="número de processos (padrão: núcleos da CPU)")
+    args = parser.parse_args(argv)
+
+    conn = banco_dados.conectar(args.banco)
+    try: registros = list(banco_dados.listar_alunos(conn, args.curso, args.data_inicio, args.data_fim))
+    except ValueError: parser.error("as datas devem estar no formato dd/mm/aaaa")
+    finally: conn.close()
+    if not registros: print("Nenhum aluno encontrado com os filtros informados."); return 1
+
+    def progresso(feitos, total, caminho):
+        print(f"[{feitos}/{total}] {caminho or 'falhou'}", flush=True)
+
+    try: caminhos, erros = gerar_lote(registros, args.saida, args.processos, args.mesclar, progresso)
+    except RuntimeError as e: print(e, file=sys.stderr); return 1
+    for codigo, erro in erros: print(f"Erro na ficha do aluno {codigo}: {erro}", file=sys.stderr)
+    print(f"{len(caminhos)} ficha(s) gerada(s) em '{args.saida}'" + (f" e reunidas em '{args.mesclar}'." if args.mesclar and caminhos else "."))
+    return 1 if erros else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
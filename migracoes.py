@@ -0,0 +1,124 @@
+# =============================================================================
+# MIGRAÇÕES DO ESQUEMA DO BANCO (versão guardada em PRAGMA user_version)
+# =============================================================================
+# Uso: python migracoes.py [--banco cadastros.db] [--lote 5000]
+#
+# banco_dados.conectar() aplica as migrações pendentes automaticamente; este comando faz o mesmo
+# mostrando o progresso, o que é útil para converter um banco grande antes de abrir o programa.
+# Cada migração roda numa única transação: se falhar no meio, o banco continua como estava.
+import argparse
+import sqlite3
+import sys
+import time
+
+import banco_dados
+
+# Linhas convertidas por bloco (leitura com fetchmany e gravação com executemany)
+TAMANHO_LOTE = 5000
+
+def versao_atual(conn):
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+def tipar_colunas(conn, progresso=None, lote=TAMANHO_LOTE):
+    """Versão 1: tabela 'alunos' toda em TEXT -> datas ISO, rendas REAL, quantidades INTEGER e sim/não 0/1.
+
+    A coluna 'idade' deixa de ser gravada (passa a ser calculada na consulta). Valores que não puderem
+    ser convertidos viram NULL e o texto original fica registrado em 'migracao_valores_descartados'.
+    """
+    total = conn.execute("SELECT count(*) FROM alunos").fetchone()[0]
+    conn.execute("CREATE TABLE IF NOT EXISTS migracao_valores_descartados (codigo INTEGER, coluna TEXT, valor TEXT)")
+    conn.execute("DROP TABLE IF EXISTS alunos_novo")
+    conn.execute(banco_dados.sql_criar_alunos('alunos_novo'))
+    inserir = f"INSERT INTO alunos_novo ({', '.join(banco_dados.COLUNAS)}) VALUES ({', '.join('?' * len(banco_dados.COLUNAS))})"
+    ultimo_codigo, feitos = None, 0
+    while True:
+        # Blocos por chave (codigo), sem OFFSET: cada leitura começa direto no ponto certo do índice
+        if ultimo_codigo is None: cursor = conn.execute("SELECT * FROM alunos ORDER BY codigo LIMIT ?", (lote,))
+        else: cursor = conn.execute("SELECT * FROM alunos WHERE codigo > ? ORDER BY codigo LIMIT ?", (ultimo_codigo, lote))
+        nomes_colunas = [d[0] for d in cursor.description]
+        linhas = cursor.fetchall()
+        if not linhas: break
+        convertidas, descartados = [], []
+        for linha in linhas:
+            dados = dict(zip(nomes_colunas, linha)); valores = []
+            for coluna in banco_dados.COLUNAS:
+                valor = dados.get(coluna)
+                if isinstance(valor, str): valor = valor.strip()
+                try: valores.append(banco_dados.converter_valor(coluna, valor))
+                except ValueError: valores.append(None); descartados.append((dados['codigo'], coluna, valor))
+            convertidas.append(valores)
+        conn.executemany(inserir, convertidas)
+        conn.executemany("INSERT INTO migracao_valores_descartados (codigo, coluna, valor) VALUES (?, ?, ?)", descartados)
+        ultimo_codigo = linhas[-1][nomes_colunas.index('codigo')]; feitos += len(linhas)
+        if progresso: progresso(feitos, total)
+    # Remover a tabela antiga também remove seus índices e triggers; conectar() os recria na versão nova.
+    # O resumo das estatísticas é refeito do zero, pois as dimensões agora leem as colunas tipadas.
+    conn.execute("DROP TABLE alunos")
+    conn.execute("ALTER TABLE alunos_novo RENAME TO alunos")
+    conn.execute("DROP TABLE IF EXISTS resumo_alunos")
+
+def versionar_linhas(conn, progresso=None, lote=TAMANHO_LOTE):
+    """Versão 2: coluna 'versao' em 'alunos' (edição concorrente) e triggers que ignoram colunas que não leem.
+
+    ADD COLUMN com DEFAULT não reescreve as linhas, então é imediato mesmo em bancos grandes.
+    """
+    colunas = [linha[1] for linha in conn.execute("PRAGMA table_info(alunos)")]
+    # Tabelas criadas agora pela versão 1 (sql_criar_alunos) já têm a coluna
+    if 'versao' not in colunas: conn.execute("ALTER TABLE alunos ADD COLUMN versao INTEGER NOT NULL DEFAULT 1")
+    # Os triggers de UPDATE passam a ter lista de colunas; conectar() os recria na versão nova
+    conn.execute("DROP TRIGGER IF EXISTS alunos_fts_au")
+    conn.execute("DROP TRIGGER IF EXISTS resumo_alunos_au")
+
+def resumir_data_nascimento(conn, progresso=None, lote=TAMANHO_LOTE):
+    """Versão 3: o resumo das estatísticas guarda a data de nascimento inteira, não só o ano.
+
+    Pelo ano, quem ainda não fez aniversário caía na faixa etária seguinte (um aluno de 17 anos em "18 a 29").
+    """
+    # conectar() recria a tabela e os triggers com a dimensão nova e refaz as contagens com GROUP BY
+    for gatilho in ('resumo_alunos_ai', 'resumo_alunos_ad', 'resumo_alunos_au'): conn.execute(f"DROP TRIGGER IF EXISTS {gatilho}")
+    conn.execute("DROP TABLE IF EXISTS resumo_alunos")
+
+# Migrações na ordem das versões: MIGRACOES[0] leva o banco da versão 0 para a 1, e assim por diante
+MIGRACOES = [tipar_colunas, versionar_linhas, resumir_data_nascimento]
+VERSAO_ESQUEMA = len(MIGRACOES)
+
+def migrar(conn, progresso=None, lote=TAMANHO_LOTE):
+    """Aplica as migrações pendentes e devolve a lista das versões aplicadas."""
+    aplicadas = []
+    for versao in range(versao_atual(conn), VERSAO_ESQUEMA):
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            MIGRACOES[versao](conn, progresso, lote)
+            conn.execute(f"PRAGMA user_version = {versao + 1}")
+            conn.commit()
+        except Exception:
+            conn.rollback(); raise
+        aplicadas.append(versao + 1)
+    return aplicadas
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Atualiza o esquema do banco de alunos para a versão atual do programa.")
+    parser.add_argument('--banco', default=banco_dados.CAMINHO_PADRAO, help="arquivo do banco SQLite")
+    parser.add_argument('--lote', type=int, default=TAMANHO_LOTE, help="linhas convertidas por bloco")
+    args = parser.parse_args(argv)
+
+    conn = sqlite3.connect(args.banco)
+    inicio = time.perf_counter()
+    try:
+        if conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'alunos'").fetchone() is None:
+            print("O banco ainda não tem a tabela de alunos; ela será criada já na versão atual ao abrir o programa."); return 0
+        print(f"Versão do esquema: {versao_atual(conn)} (atual: {VERSAO_ESQUEMA})")
+        aplicadas = migrar(conn, lambda feitos, total: print(f"  {feitos}/{total} alunos convertidos", flush=True), args.lote)
+        descartados = conn.execute("SELECT codigo, coluna, valor FROM migracao_valores_descartados ORDER BY codigo").fetchall() if 1 in aplicadas else []
+    except sqlite3.Error as e: print(f"Não foi possível migrar o banco: {e}", file=sys.stderr); return 1
+    finally: conn.close()
+    # Recria índices, triggers e o resumo sobre a tabela migrada
+    banco_dados.conectar(args.banco).close()
+
+    for codigo, coluna, valor in descartados: print(f"Aluno {codigo}: valor '{valor}' de '{coluna}' não pôde ser convertido e ficou vazio.", file=sys.stderr)
+    if aplicadas: print(f"Banco atualizado para a versão {VERSAO_ESQUEMA} em {time.perf_counter() - inicio:.2f}s.")
+    else: print("O banco já está na versão atual.")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
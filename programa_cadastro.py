@@ -1,37 +1,62 @@
 # =============================================================================
 # IMPORTAÇÃO DAS BIBLIOTECAS NECESSÁRIAS
 # =============================================================================
+# ReportLab (ficha_pdf, lote_pdf) só é importado quando uma ficha é gerada, para a janela abrir mais rápido
+import time
+INICIO_PROCESSO = time.perf_counter()
 import tkinter as tk
-from tkinter import ttk, messagebox
-from PIL import Image, ImageTk
+from tkinter import ttk, messagebox, filedialog
 from datetime import datetime
 import os
+import argparse
 import subprocess
 import sys
-import sqlite3
-
-# Importações específicas para gerar PDF com a biblioteca ReportLab
-from reportlab.pdfgen import canvas
-from reportlab.lib.pagesizes import A4
-from reportlab.lib.units import cm
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.platypus import Paragraph
-from reportlab.lib.colors import black
+from bisect import bisect_left
+
+import anexos
+import banco_dados
+import estatisticas
+import instrumentacao
+from tarefas import ExecutorTarefas
+FIM_IMPORTACOES = time.perf_counter()
+
+# Quantidade de alunos carregados por vez na lista (paginação por chave)
+TAMANHO_PAGINA = 200
+# Espera (ms) após a última tecla antes de executar a pesquisa incremental
+ATRASO_PESQUISA_MS = 250
+
+def salvar_ficha_do_formulario(dados, pasta_anexos=None, foto=None):
+    # Importação adiada: o ReportLab só é carregado na primeira ficha gerada
+    import ficha_pdf
+    # A ficha usa a miniatura reduzida da foto 3x4 (gerada aqui, fora da thread do Tk, se ainda não existir)
+    miniatura = anexos.miniatura_da_ficha(pasta_anexos, foto)
+    return ficha_pdf.salvar_ficha(dados, ficha_pdf.nome_arquivo_ficha(dados), miniatura)
+
+def abrir_arquivo(caminho):
+    # Popen não espera o visualizador fechar, ao contrário de subprocess.call
+    if sys.platform == "win32": os.startfile(caminho)
+    else: subprocess.Popen(["open" if sys.platform == "darwin" else "xdg-open", caminho])
+
+def gerar_lote(*args):
+    import lote_pdf
+    return lote_pdf.gerar_lote(*args)
 
 # =============================================================================
 # CLASSE PRINCIPAL DA APLICAÇÃO
 # =============================================================================
 class AppCadastro(tk.Tk):
-    def __init__(self):
+    def __init__(self, caminho_banco=None, banco_otimizado=None, medir_inicio=False, servidor=None):
         super().__init__()
-        
-        try:
-            self.icon_img = tk.PhotoImage(file='logo.png')
-            self.iconphoto(False, self.icon_img)
-        except tk.TclError:
-            print("Não foi possível carregar a logo como ícone.")
+        self.caminho_banco = caminho_banco; self.banco_otimizado = banco_otimizado
+        self.medir_inicio = medir_inicio; self.db_conn = None; self.servidor = servidor
+        # Pasta dos documentos anexados (ao lado do banco); só existe com o banco local
+        self.pasta_anexos = None
+        # Acesso aos cadastros: o banco local ou, com --servidor, o serviço HTTP (mesmas funções)
+        if servidor:
+            import cliente_servico
+            self.acesso = cliente_servico
+        else: self.acesso = banco_dados
 
-        self.db_conn = self.setup_database()
         self.title("Sistema de Cadastro de Alunos")
         self.state('zoomed') 
         self.apply_professional_theme()
@@ -48,6 +73,15 @@ class AppCadastro(tk.Tk):
         bottom_frame = ttk.Frame(self, style='Main.TFrame')
         bottom_frame.grid(row=1, column=0, sticky='nsew', padx=10, pady=5)
 
+        # Barra de status com o indicador de tarefas em segundo plano
+        status_frame = ttk.Frame(self, style='Main.TFrame')
+        status_frame.grid(row=2, column=0, sticky='ew', padx=10, pady=(0, 5))
+        self.status_label = ttk.Label(status_frame, text=""); self.status_label.pack(side='left')
+        self.status_barra = ttk.Progressbar(status_frame, mode='indeterminate', length=120)
+        self.tarefas = ExecutorTarefas(self, indicador=self.indicar_ocupado)
+        # O banco é aberto pela própria thread de banco: é a primeira tarefa da fila
+        self.tarefas.executar(self.setup_database, ao_falhar=lambda e: messagebox.showerror("Erro Crítico", f"Não foi possível abrir o banco de dados.\nErro: {e}"))
+
         self.create_search_widgets(top_frame)
 
         main_form_frame = ttk.Frame(top_frame, style='Main.TFrame')
@@ -58,38 +92,75 @@ class AppCadastro(tk.Tk):
         
         self.widgets = {}
         self.create_form_widgets(main_form_frame)
+        # Funções de leitura e escrita de cada campo, escolhidas uma vez pelo tipo do widget
+        self.campos = {key: self.acessores_do_campo(widget) for key, widget in self.widgets.items()}
+        # Valores da tela logo após carregar um aluno (vazio = aluno novo) e a versão do cadastro carregada
+        self.valores_carregados = {}; self.versao_carregada = None
         self.create_student_list_widgets(bottom_frame)
         
         self.limpar_campos()
+        # A lista só é carregada depois que a janela aparece na tela
+        self.bind('<Map>', self.ao_exibir_janela)
         
         self.protocol("WM_DELETE_WINDOW", self.on_closing)
 
+    def ao_exibir_janela(self, event):
+        if event.widget is not self: return
+        self.unbind('<Map>')
+        self.after_idle(self.primeira_pintura)
+
+    def primeira_pintura(self):
+        self.primeira_pintura_em = time.perf_counter()
+        self.atualizar_lista_alunos()
+        self.after_idle(self.carregar_icone)
+
+    def carregar_icone(self):
+        # Decodificar a logo em tamanho original é lento; fica para depois da janela aparecer
+        try:
+            self.icon_img = tk.PhotoImage(file=os.path.join(os.path.dirname(os.path.abspath(__file__)), 'logo.png'))
+            self.iconphoto(False, self.icon_img)
+        except tk.TclError:
+            print("Não foi possível carregar a logo como ícone.")
+
+    def relatar_inicio(self):
+        # Modo --medir-inicio: mostra os tempos de abertura e fecha o programa
+        agora = time.perf_counter()
+        print(f"Importações:        {(FIM_IMPORTACOES - INICIO_PROCESSO) * 1000:8.1f} ms")
+        print(f"Primeira pintura:   {(self.primeira_pintura_em - INICIO_PROCESSO) * 1000:8.1f} ms")
+        print(f"Lista carregada:    {(agora - INICIO_PROCESSO) * 1000:8.1f} ms")
+        self.on_closing()
+
     def on_closing(self):
-        if hasattr(self, 'db_conn') and self.db_conn: self.db_conn.close()
+        # A janela fecha na hora; a conexão é fechada pela thread de banco quando a tarefa em andamento terminar
+        if hasattr(self, 'tarefas'): self.tarefas.encerrar(self.fechar_conexao)
+        else: self.fechar_conexao()
         self.destroy()
 
+    def fechar_conexao(self):
+        if self.db_conn: self.db_conn.close()
+
     def setup_database(self):
-        conn = sqlite3.connect('cadastros.db')
-        cursor = conn.cursor()
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS alunos (
-                codigo INTEGER PRIMARY KEY, data_inscricao TEXT, area TEXT, nome_completo TEXT, 
-                curso TEXT, sexo TEXT, data_nascimento TEXT, idade TEXT, cpf TEXT, estado_civil TEXT, 
-                cep TEXT, rua TEXT, numero TEXT, complemento TEXT, ponto_referencia TEXT, contato1 TEXT, 
-                contato2 TEXT, escola TEXT, frequenta_escola TEXT, serie TEXT, ensino TEXT, 
-                trabalha TEXT, profissao TEXT, renda_mensal TEXT, nome_pai TEXT, nome_mae TEXT, 
-                num_irmaos TEXT, pessoas_residencia TEXT, mora_pais TEXT, mora_mae_pai TEXT, 
-                mora_parentes TEXT, mora_conjuge TEXT, nome_conjuge TEXT, renda_conjuge TEXT, 
-                num_filhos TEXT, renda_familiar TEXT, beneficio_gov TEXT, qual_beneficio TEXT, 
-                desc_familiar TEXT, data_inicio_curso TEXT, data_conclusao_curso TEXT, 
-                desistencia TEXT, doc_id TEXT, doc_cpf TEXT, doc_residencia TEXT, doc_vacina TEXT, 
-                doc_foto TEXT, observacao TEXT, aceite_declaracao TEXT
-            )''')
-        try:
-            cursor.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_cpf ON alunos (cpf)")
-        except sqlite3.OperationalError: pass
-        conn.commit()
-        return conn
+        # Executada na thread de banco do ExecutorTarefas, a única que usa a conexão
+        if self.servidor: self.db_conn = self.acesso.conectar(self.servidor)
+        else:
+            self.db_conn = banco_dados.conectar(self.caminho_banco, self.banco_otimizado, check_same_thread=False)
+            self.pasta_anexos = anexos.pasta_anexos(self.db_conn)
+
+    def indicar_ocupado(self, ocupado):
+        if ocupado:
+            self.status_label.config(text="Processando..."); self.status_barra.pack(side='left', padx=5); self.status_barra.start(15)
+        else:
+            self.status_barra.stop(); self.status_barra.pack_forget(); self.status_label.config(text="")
+
+    def conexao(self):
+        # Se setup_database falhou, cada ação de banco para com esta mensagem em vez de um AttributeError
+        if self.db_conn is None: raise RuntimeError("O banco de dados não está aberto (veja o erro ao iniciar o programa).")
+        return self.db_conn
+
+    def em_segundo_plano(self, funcao, *args, ao_concluir=None, ao_falhar=None, titulo_erro="Erro no Banco de Dados"):
+        # Executa funcao(conexao, *args) fora da thread do Tk; erros viram uma mensagem na tela
+        self.tarefas.executar(lambda: funcao(self.conexao(), *args), ao_concluir=ao_concluir,
+                              ao_falhar=ao_falhar or (lambda e: messagebox.showerror(titulo_erro, f"A operação não pôde ser concluída.\nErro: {e}")))
 
     def apply_professional_theme(self):
         self.style = ttk.Style(self)
@@ -109,19 +180,9 @@ class AppCadastro(tk.Tk):
         self.style.configure('TCombobox', fieldbackground='#FFFFFF', foreground=TEXT_COLOR)
         self.style.configure("Treeview.Heading", font=('Helvetica', 10, 'bold'))
 
-    def carregar_ultimo_codigo(self):
-        try:
-            cursor = self.db_conn.cursor()
-            cursor.execute("SELECT MAX(codigo) FROM alunos")
-            resultado = cursor.fetchone()[0]
-            return resultado if resultado is not None else 0
-        except Exception as e:
-            print(f"Erro ao carregar último código: {e}"); return 0
-
     def calcular_idade(self, event=None):
         try:
-            data_nasc = datetime.strptime(self.widgets['data_nascimento'].get(), '%d/%m/%Y')
-            idade = datetime.today().year - data_nasc.year - ((datetime.today().month, datetime.today().day) < (data_nasc.month, data_nasc.day))
+            idade = banco_dados.calcular_idade(self.widgets['data_nascimento'].get())
             self.widgets['idade'].config(state='normal'); self.widgets['idade'].delete(0, tk.END); self.widgets['idade'].insert(0, str(idade)); self.widgets['idade'].config(state='readonly')
         except ValueError:
             self.widgets['idade'].config(state='normal'); self.widgets['idade'].delete(0, tk.END); self.widgets['idade'].config(state='readonly')
@@ -133,6 +194,33 @@ class AppCadastro(tk.Tk):
         self.busca_codigo_entry = ttk.Entry(search_frame, width=15)
         self.busca_codigo_entry.pack(side='left', padx=5)
         ttk.Button(search_frame, text="Buscar", command=self.buscar_e_carregar_aluno).pack(side='left', padx=5)
+        ttk.Label(search_frame, text="Pesquisar (nome, CPF, curso ou código):").pack(side='left', padx=(20, 5))
+        self.pesquisa_var = tk.StringVar(); self.pesquisa_agendada = None; self.modo_pesquisa = False
+        ttk.Entry(search_frame, textvariable=self.pesquisa_var, width=40).pack(side='left', fill='x', expand=True, padx=5)
+        self.pesquisa_var.trace_add('write', self.agendar_pesquisa)
+
+    def agendar_pesquisa(self, *args):
+        # Debounce: só pesquisa quando o usuário para de digitar por ATRASO_PESQUISA_MS
+        if self.pesquisa_agendada: self.after_cancel(self.pesquisa_agendada)
+        self.pesquisa_agendada = self.after(ATRASO_PESQUISA_MS, self.executar_pesquisa)
+
+    def executar_pesquisa(self):
+        self.pesquisa_agendada = None
+        texto = self.pesquisa_var.get().strip()
+        if not texto:
+            if self.modo_pesquisa: self.modo_pesquisa = False; self.atualizar_lista_alunos()
+            return
+        self.em_segundo_plano(self.acesso.pesquisar_alunos, texto, TAMANHO_PAGINA, ao_concluir=lambda linhas: self.mostrar_resultados_pesquisa(texto, linhas))
+
+    def mostrar_resultados_pesquisa(self, texto, linhas):
+        with instrumentacao.medir('tela: resultados da pesquisa'):
+            # Descarta respostas de pesquisas que o usuário já alterou
+            if texto != self.pesquisa_var.get().strip(): return
+            # No modo pesquisa a lista mostra só os resultados, sem paginação por rolagem
+            self.modo_pesquisa = True; self.geracao_lista += 1
+            for i in self.tree.get_children(): self.tree.delete(i)
+            self.chaves_lista = []; self.lista_esgotada = True
+            for codigo, nome, cpf in linhas: self.tree.insert("", "end", iid=str(codigo), values=(codigo, nome, cpf))
 
     def create_student_list_widgets(self, parent):
         list_frame = ttk.LabelFrame(parent, text="Alunos Cadastrados (clique para carregar)", padding="10")
@@ -140,10 +228,14 @@ class AppCadastro(tk.Tk):
         columns = ('codigo', 'nome', 'cpf'); self.tree = ttk.Treeview(list_frame, columns=columns, show='headings')
         self.tree.heading('codigo', text='Código'); self.tree.heading('nome', text='Nome Completo'); self.tree.heading('cpf', text='CPF')
         self.tree.column('codigo', width=80, anchor='center'); self.tree.column('nome', width=400); self.tree.column('cpf', width=150, anchor='center')
-        tree_scrollbar = ttk.Scrollbar(list_frame, orient="vertical", command=self.tree.yview)
-        self.tree.configure(yscrollcommand=tree_scrollbar.set)
-        tree_scrollbar.pack(side='right', fill='y'); self.tree.pack(side='left', fill='both', expand=True)
+        self.tree_scrollbar = ttk.Scrollbar(list_frame, orient="vertical", command=self.tree.yview)
+        self.tree.configure(yscrollcommand=self.ao_rolar_lista)
+        self.tree_scrollbar.pack(side='right', fill='y'); self.tree.pack(side='left', fill='both', expand=True)
         self.tree.bind('<<TreeviewSelect>>', self.carregar_aluno_da_lista)
+        # Chaves (nome, codigo) das linhas carregadas, na mesma ordem da Treeview
+        self.chaves_lista = []; self.lista_esgotada = False; self.pagina_agendada = False
+        # Incrementada a cada recarga, para ignorar páginas pedidas antes dela
+        self.geracao_lista = 0
 
     def create_form_widgets(self, parent):
         left_column = ttk.Frame(parent, style='Main.TFrame')
@@ -232,6 +324,9 @@ class AppCadastro(tk.Tk):
         doc_frame = ttk.LabelFrame(right_column, text="Documentos Entregues", padding="10"); doc_frame.grid(row=2, column=0, sticky='ew', pady=5)
         doc_fields = [("Identidade", "doc_id"), ("CPF", "doc_cpf"), ("Residência", "doc_residencia"), ("Vacina", "doc_vacina"), ("Foto 3x4", "doc_foto")]
         for i, (text, key) in enumerate(doc_fields): self.widgets[key] = tk.BooleanVar(); ttk.Checkbutton(doc_frame, text=text, variable=self.widgets[key]).pack(side='left', padx=10, expand=True)
+        ttk.Button(doc_frame, text="Anexos...", command=self.abrir_anexos).pack(side='left', padx=10)
+        # Miniatura da foto 3x4 do aluno carregado, preenchida depois do formulário (carregar_foto)
+        self.foto_label = ttk.Label(doc_frame); self.foto_label.pack(side='left', padx=5); self.foto_img = None
         
         obs_frame = ttk.LabelFrame(right_column, text="Observação", padding="10"); obs_frame.grid(row=3, column=0, sticky='ew', pady=5)
         self.widgets['observacao'] = tk.Text(obs_frame, height=3, bg="#FFFFFF", fg="#333333", relief="solid", borderwidth=1); self.widgets['observacao'].pack(fill='x', expand=True, padx=5, pady=5)
@@ -241,59 +336,101 @@ class AppCadastro(tk.Tk):
         
         btn_frame = ttk.Frame(right_column); btn_frame.grid(row=5, column=0, sticky='ew', pady=10)
         ttk.Button(btn_frame, text="Limpar", command=self.limpar_campos).pack(side='left', expand=True)
+        ttk.Button(btn_frame, text="Estatísticas", command=self.abrir_painel).pack(side='right', expand=True, padx=5)
+        ttk.Button(btn_frame, text="Gerar em Lote", command=self.abrir_gerar_lote).pack(side='right', expand=True, padx=5)
         ttk.Button(btn_frame, text="Gerar PDF", command=self.gerar_pdf).pack(side='right', expand=True, padx=5)
         ttk.Button(btn_frame, text="Salvar", command=self.salvar_cadastro).pack(side='right', expand=True)
+        if instrumentacao.ATIVO: ttk.Button(btn_frame, text="Diagnóstico", command=self.abrir_diagnostico).pack(side='left', expand=True, padx=5)
+
+    def acessores_do_campo(self, widget):
+        """(ler, escrever) do widget: ler devolve o texto da tela e escrever recebe o texto de para_exibicao."""
+        if isinstance(widget, tk.BooleanVar):
+            return (lambda: "Sim" if widget.get() else "Não"), (lambda valor: widget.set(valor == 'Sim'))
+        if isinstance(widget, tk.Text):
+            def escrever_texto(valor): widget.delete("1.0", tk.END); widget.insert("1.0", valor)
+            return (lambda: widget.get("1.0", tk.END).strip()), escrever_texto
+        if isinstance(widget, ttk.Combobox): return (lambda: widget.get().strip()), widget.set
+        def escrever_entrada(valor):
+            is_readonly = widget['state'] == 'readonly'
+            if is_readonly: widget.config(state='normal')
+            widget.delete(0, tk.END); widget.insert(0, valor)
+            if is_readonly: widget.config(state='readonly')
+        return (lambda: widget.get().strip()), escrever_entrada
 
     def coletar_dados(self):
         dados = {}
-        for key, widget in self.widgets.items():
-            try:
-                if isinstance(widget, (ttk.Entry, ttk.Combobox)): dados[key] = widget.get().strip()
-                elif isinstance(widget, tk.Text): dados[key] = widget.get("1.0", tk.END).strip()
-                elif isinstance(widget, tk.BooleanVar): dados[key] = "Sim" if widget.get() else "Não"
-            except: dados[key] = ""
+        for key, (ler, _) in self.campos.items():
+            try: dados[key] = ler()
+            except tk.TclError: dados[key] = ""
         return dados
 
     def limpar_campos(self):
-        codigo_atual = self.carregar_ultimo_codigo() + 1
         for key, widget in self.widgets.items():
             if key in ['codigo', 'data_inscricao']: continue
             if isinstance(widget, ttk.Combobox): widget.set('')
             elif isinstance(widget, ttk.Entry) and widget['state'] != 'readonly': widget.delete(0, tk.END)
             elif isinstance(widget, tk.Text): widget.delete("1.0", tk.END)
             elif isinstance(widget, tk.BooleanVar): widget.set(False)
-        self.widgets['codigo'].config(state='normal'); self.widgets['codigo'].delete(0, tk.END); self.widgets['codigo'].insert(0, str(codigo_atual).zfill(4)); self.widgets['codigo'].config(state='readonly')
+        self.widgets['codigo'].config(state='normal'); self.widgets['codigo'].delete(0, tk.END); self.widgets['codigo'].config(state='readonly')
         self.widgets['data_inscricao'].config(state='normal'); self.widgets['data_inscricao'].delete(0, tk.END); self.widgets['data_inscricao'].insert(0, datetime.now().strftime('%d/%m/%Y')); self.widgets['data_inscricao'].config(state='readonly')
         self.widgets['idade'].config(state='normal'); self.widgets['idade'].delete(0, tk.END); self.widgets['idade'].config(state='readonly')
-        self.busca_codigo_entry.delete(0, tk.END)
+        self.busca_codigo_entry.delete(0, tk.END); self.codigo_carregado = None; self.valores_carregados = {}; self.versao_carregada = None
+        self.mostrar_foto(None, None)
         if self.tree.selection(): self.tree.selection_remove(self.tree.selection())
-        self.atualizar_lista_alunos()
+        self.em_segundo_plano(self.acesso.proximo_codigo, ao_concluir=self.mostrar_proximo_codigo)
+
+    def mostrar_proximo_codigo(self, codigo):
+        # Só preenche se o formulário ainda estiver vazio (o usuário pode ter carregado um aluno)
+        if self.widgets['codigo'].get(): return
+        self.widgets['codigo'].config(state='normal'); self.widgets['codigo'].insert(0, str(codigo).zfill(4)); self.widgets['codigo'].config(state='readonly')
 
     def salvar_cadastro(self):
-        dados = self.coletar_dados(); cpf = dados.get('cpf'); codigo_atual = int(self.widgets['codigo'].get())
-        if not dados.get('nome_completo') or not cpf or not dados.get('curso'):
-            return messagebox.showerror("Erro de Validação", "Nome, CPF e Curso são campos obrigatórios!")
-        cursor = self.db_conn.cursor(); cursor.execute("SELECT codigo FROM alunos WHERE cpf = ? AND codigo != ?", (cpf, codigo_atual))
-        outro_aluno_com_cpf = cursor.fetchone()
-        if outro_aluno_com_cpf: return messagebox.showerror("CPF Duplicado", f"O CPF '{cpf}' já está cadastrado para o aluno com código {outro_aluno_com_cpf[0]}.")
-        colunas_ordem = ['codigo', 'data_inscricao', 'area', 'nome_completo', 'curso', 'sexo', 'data_nascimento', 'idade', 'cpf', 'estado_civil', 'cep', 'rua', 'numero', 'complemento', 'ponto_referencia', 'contato1', 'contato2', 'escola', 'frequenta_escola', 'serie', 'ensino', 'trabalha', 'profissao', 'renda_mensal', 'nome_pai', 'nome_mae', 'num_irmaos', 'pessoas_residencia','mora_pais', 'mora_mae_pai', 'mora_parentes', 'mora_conjuge', 'nome_conjuge', 'renda_conjuge', 'num_filhos', 'renda_familiar', 'beneficio_gov', 'qual_beneficio', 'desc_familiar','data_inicio_curso', 'data_conclusao_curso', 'desistencia', 'doc_id', 'doc_cpf', 'doc_residencia', 'doc_vacina', 'doc_foto', 'observacao', 'aceite_declaracao']
-        dados['codigo'] = codigo_atual; valores = [dados.get(col, '') for col in colunas_ordem]
-        try:
-            placeholders = ', '.join(['?'] * len(valores))
-            cursor.execute(f"INSERT OR REPLACE INTO alunos ({', '.join(colunas_ordem)}) VALUES ({placeholders})", valores)
-            self.db_conn.commit(); messagebox.showinfo("Sucesso", f"Aluno {dados['nome_completo']} salvo com sucesso!"); self.limpar_campos()
-        except Exception as e: messagebox.showerror("Erro ao Salvar", f"Não foi possível salvar os dados no banco.\nErro: {e}")
+        dados = self.coletar_dados(); cpf = dados.get('cpf')
+        erro = banco_dados.validar_cadastro(dados)
+        if erro: return messagebox.showerror("Erro de Validação", erro)
+        if self.codigo_carregado is not None: return self.salvar_alteracoes(dados)
+        # Aluno novo vai sem código: o número mostrado é só uma prévia e o definitivo é
+        # reservado na gravação, para dois postos nunca salvarem com o mesmo código
+        dados['codigo'] = None; registro = banco_dados.para_banco(dados)
+
+        def concluir(resultado):
+            codigo, outro_aluno_com_cpf = resultado
+            if outro_aluno_com_cpf is not None: return messagebox.showerror("CPF Duplicado", f"O CPF '{cpf}' já está cadastrado para o aluno com código {outro_aluno_com_cpf}.")
+            messagebox.showinfo("Sucesso", f"Aluno {dados['nome_completo']} salvo com sucesso com o código {str(codigo).zfill(4)}!")
+            self.atualizar_linha_lista(codigo, dados['nome_completo'], cpf); self.limpar_campos()
+        self.em_segundo_plano(self.acesso.gravar_cadastro, registro, ao_concluir=concluir, titulo_erro="Erro ao Salvar")
+
+    def campos_alterados(self, dados):
+        return {key: valor for key, valor in dados.items() if key in banco_dados.COLUNAS and key != 'codigo' and valor != self.valores_carregados.get(key)}
+
+    def salvar_alteracoes(self, dados):
+        # Aluno carregado: só os campos que mudaram desde a carga, e só se nenhum outro posto gravou o aluno nesse meio-tempo
+        codigo, cpf = self.codigo_carregado, dados.get('cpf')
+        alterados = self.campos_alterados(dados)
+        if not alterados: return messagebox.showinfo("Nada a Salvar", "Nenhum campo foi alterado desde que o cadastro foi carregado.")
+
+        def concluir(resultado):
+            _, outro_aluno_com_cpf = resultado
+            if outro_aluno_com_cpf is not None: return messagebox.showerror("CPF Duplicado", f"O CPF '{cpf}' já está cadastrado para o aluno com código {outro_aluno_com_cpf}.")
+            messagebox.showinfo("Sucesso", f"Aluno {dados['nome_completo']} salvo com sucesso com o código {str(codigo).zfill(4)}!")
+            self.atualizar_linha_lista(codigo, dados['nome_completo'], cpf); self.limpar_campos()
+
+        def falhar(e):
+            if not isinstance(e, banco_dados.CadastroAlterado): return messagebox.showerror("Erro ao Salvar", f"A operação não pôde ser concluída.\nErro: {e}")
+            if e.versao_atual is None: return messagebox.showerror("Cadastro Excluído", str(e))
+            campos = ', '.join(sorted(alterados))
+            if messagebox.askyesno("Cadastro Alterado em Outro Posto", f"{e}\n\nSuas alterações ({campos}) não foram gravadas.\nRecarregar o cadastro atual? As alterações feitas aqui serão descartadas."):
+                self.buscar_e_carregar_aluno(codigo)
+        self.em_segundo_plano(self.acesso.alterar_cadastro, codigo, self.versao_carregada, banco_dados.para_banco(alterados), ao_concluir=concluir, ao_falhar=falhar)
 
     def buscar_e_carregar_aluno(self, codigo_busca=None):
         if codigo_busca is None:
             try: codigo_busca = int(self.busca_codigo_entry.get())
             except (ValueError, TypeError): return messagebox.showerror("Erro de Busca", "Por favor, digite um código de aluno válido.")
-        cursor = self.db_conn.cursor(); cursor.execute("SELECT * FROM alunos WHERE codigo = ?", (codigo_busca,))
-        aluno_encontrado = cursor.fetchone()
-        if aluno_encontrado:
-            nomes_colunas = [d[0] for d in cursor.description]; dados_aluno = dict(zip(nomes_colunas, aluno_encontrado))
-            self.popular_formulario(dados_aluno)
-        else: messagebox.showwarning("Não Encontrado", f"Nenhum aluno encontrado com o código {codigo_busca}.")
+        def concluir(dados_aluno):
+            if dados_aluno: self.popular_formulario(dados_aluno)
+            else: messagebox.showwarning("Não Encontrado", f"Nenhum aluno encontrado com o código {codigo_busca}.")
+        self.em_segundo_plano(self.acesso.buscar_aluno, codigo_busca, ao_concluir=concluir)
 
     def carregar_aluno_da_lista(self, event):
         selecao = self.tree.selection()
@@ -301,122 +438,297 @@ class AppCadastro(tk.Tk):
         valores = self.tree.item(selecao[0], 'values'); self.buscar_e_carregar_aluno(int(valores[0]))
 
     def popular_formulario(self, dados_aluno):
-        for key, widget in self.widgets.items():
-            valor = dados_aluno.get(key, "")
-            if isinstance(widget, ttk.Entry):
-                is_readonly = widget['state'] == 'readonly'
-                if is_readonly: widget.config(state='normal')
-                widget.delete(0, tk.END); widget.insert(0, str(valor))
-                if is_readonly: widget.config(state='readonly')
-            elif isinstance(widget, ttk.Combobox): widget.set(str(valor))
-            elif isinstance(widget, tk.Text): widget.delete("1.0", tk.END); widget.insert("1.0", str(valor))
-            elif isinstance(widget, tk.BooleanVar): widget.set(True if valor == 'Sim' else False)
+        with instrumentacao.medir('tela: formulário'):
+            # O banco devolve datas ISO, números e 1/0; a tela mostra dd/mm/aaaa, "1.234,56" e Sim/Não
+            self.codigo_carregado = int(dados_aluno['codigo']); self.versao_carregada = dados_aluno.get('versao')
+            dados_aluno = banco_dados.para_exibicao(dados_aluno); carregados = {}
+            for key, (ler, escrever) in self.campos.items():
+                # Só reescreve os campos cujo valor muda (trocar de aluno costuma manter curso, área, sim/não...)
+                valor = ler()
+                if valor != dados_aluno.get(key, ""): escrever(dados_aluno.get(key, "")); valor = ler()
+                carregados[key] = valor
+            # Guardado como a tela mostra, para salvar_alteracoes enviar só o que o usuário mudar
+            self.valores_carregados = carregados
+            # A foto não atrasa o formulário: é procurada e reduzida em segundo plano
+            self.mostrar_foto(self.codigo_carregado, None); self.after_idle(self.carregar_foto)
+
+    def carregar_foto(self):
+        codigo = self.codigo_carregado
+        if codigo is None or not self.pasta_anexos: return
+        def reduzir(foto):
+            if foto is None or codigo != self.codigo_carregado: return
+            self.tarefas.executar_paralelo(anexos.miniatura, self.pasta_anexos, foto, 'icone',
+                                           ao_concluir=lambda caminho: self.mostrar_foto(codigo, caminho), ao_falhar=lambda e: None)
+        self.em_segundo_plano(anexos.foto_3x4, codigo, ao_concluir=reduzir)
+
+    def mostrar_foto(self, codigo, caminho):
+        # Respostas atrasadas (o usuário já carregou outro aluno) são descartadas
+        if codigo != self.codigo_carregado: return
+        self.foto_img = tk.PhotoImage(file=caminho) if caminho else None
+        self.foto_label.config(image=self.foto_img or '')
 
     def atualizar_lista_alunos(self):
+        # Recomeça a lista do início; as demais páginas são carregadas conforme a rolagem
         for i in self.tree.get_children(): self.tree.delete(i)
-        cursor = self.db_conn.cursor(); cursor.execute("SELECT codigo, nome_completo, cpf FROM alunos ORDER BY nome_completo ASC")
-        for row in cursor.fetchall(): self.tree.insert("", "end", values=row)
+        self.chaves_lista = []; self.lista_esgotada = False; self.geracao_lista += 1
+        self.carregar_proxima_pagina()
+
+    def carregar_proxima_pagina(self):
+        if self.lista_esgotada: self.pagina_agendada = False; return
+        self.pagina_agendada = True; geracao = self.geracao_lista
+        apos = self.chaves_lista[-1] if self.chaves_lista else None
+        self.em_segundo_plano(self.acesso.pagina_alunos, apos, TAMANHO_PAGINA, ao_concluir=lambda linhas: self.mostrar_pagina(geracao, linhas))
+
+    def mostrar_pagina(self, geracao, linhas):
+        with instrumentacao.medir('tela: página da lista'):
+            if geracao != self.geracao_lista: return
+            self.pagina_agendada = False
+            for codigo, nome, cpf in linhas:
+                # A linha pode já ter sido inserida por atualizar_linha_lista enquanto a página carregava
+                if self.tree.exists(str(codigo)): continue
+                self.tree.insert("", "end", iid=str(codigo), values=(codigo, nome, cpf)); self.chaves_lista.append((nome, codigo))
+            if len(linhas) < TAMANHO_PAGINA: self.lista_esgotada = True
+            if self.medir_inicio and geracao == 1: self.relatar_inicio()
+
+    def ao_rolar_lista(self, inicio, fim):
+        self.tree_scrollbar.set(inicio, fim)
+        # Perto do fim do que já foi carregado, busca a próxima página
+        if float(fim) > 0.9 and not self.lista_esgotada and not self.pagina_agendada:
+            self.pagina_agendada = True; self.after_idle(self.carregar_proxima_pagina)
+
+    def atualizar_linha_lista(self, codigo, nome, cpf):
+        with instrumentacao.medir('tela: linha da lista'):
+            # Atualiza só a linha salva, mantendo a ordem por (nome, codigo) sem recarregar a lista
+            iid = str(codigo)
+            if self.modo_pesquisa:
+                if self.tree.exists(iid): self.tree.item(iid, values=(codigo, nome, cpf))
+                return
+            if self.tree.exists(iid):
+                posicao = self.tree.index(iid); self.tree.delete(iid); del self.chaves_lista[posicao]
+            chave = (nome, codigo)
+            # Linhas além da última página carregada aparecerão quando a rolagem chegar nelas
+            if not self.lista_esgotada and (not self.chaves_lista or chave > self.chaves_lista[-1]): return
+            posicao = bisect_left(self.chaves_lista, chave)
+            self.tree.insert("", posicao, iid=iid, values=(codigo, nome, cpf)); self.chaves_lista.insert(posicao, chave)
 
     def gerar_pdf(self):
         dados = self.coletar_dados()
         if not dados.get('nome_completo'): return messagebox.showerror("Erro", "Carregue os dados de um aluno para gerar a ficha.")
-        nome_aluno = dados.get('nome_completo', 'aluno_sem_nome'); codigo_aluno = dados.get('codigo', '0000')
-        nome_arquivo = f"Ficha_Inscricao_{codigo_aluno}_{nome_aluno.replace(' ', '_')}.pdf"
-        
-        try:
-            c = canvas.Canvas(nome_arquivo, pagesize=A4); largura, altura = A4
-            
-            MARGEM_X = 2*cm; MARGEM_Y_SUPERIOR = 27.5*cm; MARGEM_INFERIOR = 2.5*cm
-            LARGURA_UTIL = largura - 2*MARGEM_X
-            ESPACAMENTO_LINHA, ESPACAMENTO_SECAO = 0.6*cm, 1*cm
-            y_atual = MARGEM_Y_SUPERIOR
-
-            def check_page_break():
-                nonlocal y_atual
-                if y_atual < MARGEM_INFERIOR:
-                    c.showPage(); y_atual = MARGEM_Y_SUPERIOR
-                    return True
-                return False
-
-            def desenha_titulo_secao(texto):
-                nonlocal y_atual
-                if check_page_break(): y_atual -= 0.5*cm
-                y_atual -= ESPACAMENTO_SECAO; c.setFont("Helvetica-Bold", 11); c.setFillColor(black)
-                c.drawString(MARGEM_X, y_atual, texto.upper()); y_atual -= 0.1*cm
-                c.line(MARGEM_X, y_atual, MARGEM_X + LARGURA_UTIL, y_atual); y_atual -= ESPACAMENTO_LINHA*1.5
-            
-            def desenha_campo(label, valor, x_offset: float = 0.0):
-                nonlocal y_atual
-                if check_page_break(): desenha_titulo_secao("Continuação da Ficha")
-                c.setFont("Helvetica-Bold", 9); c.drawString(MARGEM_X + x_offset, y_atual, f"{label}:")
-                c.setFont("Helvetica", 9); c.drawString(MARGEM_X + x_offset + 3.5*cm, y_atual, str(dados.get(valor, '')))
-
-            def desenha_paragrafo(texto):
-                nonlocal y_atual; check_page_break()
-                p = Paragraph(texto, ParagraphStyle(name='Normal', fontName='Helvetica', fontSize=9, leading=12))
-                largura_p, altura_p = p.wrapOn(c, LARGURA_UTIL, altura)
-                if y_atual - altura_p < MARGEM_INFERIOR: c.showPage(); y_atual = MARGEM_Y_SUPERIOR; desenha_titulo_secao("Continuação da Ficha")
-                y_atual -= altura_p; p.drawOn(c, MARGEM_X, y_atual); y_atual -= ESPACAMENTO_LINHA
-            
-            try: c.drawImage("logo.png", MARGEM_X, y_atual-1.2*cm, width=4*cm, height=2.5*cm, preserveAspectRatio=True, anchor='n')
-            except: c.drawString(MARGEM_X, y_atual-0.5*cm, "[Logo]")
-            c.setFont("Helvetica-Bold", 18); c.drawCentredString(largura/2, y_atual, "FICHA DE INSCRIÇÃO"); y_atual -= 0.5*cm
-            c.line(MARGEM_X, y_atual, LARGURA_UTIL + MARGEM_X, y_atual)
-            
-            desenha_titulo_secao("Ficha de Inscrição")
-            desenha_campo("Código", "codigo"); desenha_campo("Data da Inscrição", "data_inscricao", x_offset=8.5*cm); y_atual -= ESPACAMENTO_LINHA
-            desenha_campo("Nome Completo", "nome_completo"); y_atual -= ESPACAMENTO_LINHA
-            desenha_campo("Curso", "curso"); desenha_campo("Área", "area", x_offset=8.5*cm); y_atual -= ESPACAMENTO_LINHA
-            desenha_campo("Data de Nascimento", "data_nascimento"); desenha_campo("Idade", "idade", x_offset=8.5*cm); y_atual -= ESPACAMENTO_LINHA
-            desenha_campo("CPF", "cpf"); desenha_campo("Sexo", "sexo", x_offset=8.5*cm); y_atual -= ESPACAMENTO_LINHA
-            desenha_campo("Estado Civil", "estado_civil")
-            
-            desenha_titulo_secao("Endereço e Contato")
-            desenha_campo("CEP", "cep"); desenha_campo("Rua", "rua", x_offset=5*cm); y_atual -= ESPACAMENTO_LINHA
-            desenha_campo("Número", "numero"); desenha_campo("Complemento", "complemento", x_offset=5*cm); y_atual -= ESPACAMENTO_LINHA
-            desenha_campo("Ponto de Referência", "ponto_referencia"); y_atual -= ESPACAMENTO_LINHA
-            desenha_campo("Contato 1", "contato1"); desenha_campo("Contato 2", "contato2", x_offset=8.5*cm)
-            
-            desenha_titulo_secao("Dados Escolares")
-            desenha_campo("Escola", "escola"); desenha_campo("Frequenta?", "frequenta_escola", x_offset=10*cm); y_atual -= ESPACAMENTO_LINHA
-            desenha_campo("Série", "serie"); desenha_campo("Ensino", "ensino", x_offset=8.5*cm); y_atual -= ESPACAMENTO_LINHA
-            desenha_campo("Trabalha?", "trabalha"); desenha_campo("Profissão", "profissao", x_offset=8.5*cm); y_atual -= ESPACAMENTO_LINHA
-            desenha_campo("Renda Mensal", "renda_mensal")
-
-            desenha_titulo_secao("Dados da Residência")
-            desenha_campo("Nome do Pai", "nome_pai"); y_atual -= ESPACAMENTO_LINHA
-            desenha_campo("Nome da Mãe", "nome_mae"); y_atual -= ESPACAMENTO_LINHA
-            desenha_campo("N° de Irmãos", "num_irmaos"); desenha_campo("Pessoas na Residência", "pessoas_residencia", x_offset=8.5*cm); y_atual -= ESPACAMENTO_LINHA
-            desenha_campo("N° de Filhos", "num_filhos"); desenha_campo("Renda Familiar", "renda_familiar", x_offset=8.5*cm); y_atual -= ESPACAMENTO_LINHA
-            desenha_campo("Nome do Cônjuge", "nome_conjuge"); desenha_campo("Renda do Cônjuge", "renda_conjuge", x_offset=8.5*cm); y_atual -= ESPACAMENTO_LINHA
-            check_texto = f"Mora com: {'Pais' if dados.get('mora_pais')=='Sim' else ''} {'Mãe/Pai' if dados.get('mora_mae_pai')=='Sim' else ''} {'Parentes' if dados.get('mora_parentes')=='Sim' else ''} {'Cônjuge' if dados.get('mora_conjuge')=='Sim' else ''}"
-            c.setFont("Helvetica-Bold", 9); c.drawString(MARGEM_X, y_atual, "Configuração de Moradia:"); c.setFont("Helvetica", 9); c.drawString(MARGEM_X + 4*cm, y_atual, check_texto)
-            y_atual -= ESPACAMENTO_LINHA; desenha_campo("Recebe Benefício?", "beneficio_gov"); desenha_campo("Qual?", "qual_beneficio", x_offset=8.5*cm); y_atual -= ESPACAMENTO_LINHA
-            c.setFont("Helvetica-Bold", 9); c.drawString(MARGEM_X, y_atual, "Descrição Familiar:"); y_atual -= 0.4*cm
-            desenha_paragrafo(dados.get('desc_familiar', ''))
-
-            desenha_titulo_secao("Documentos Entregues")
-            doc_texto = f"ID: {'(X)' if dados.get('doc_id')=='Sim' else '( )'} | CPF: {'(X)' if dados.get('doc_cpf')=='Sim' else '( )'} | Residência: {'(X)' if dados.get('doc_residencia')=='Sim' else '( )'} | Vacina: {'(X)' if dados.get('doc_vacina')=='Sim' else '( )'} | Foto 3x4: {'(X)' if dados.get('doc_foto')=='Sim' else '( )'}"
-            c.setFont("Helvetica", 9); c.drawString(MARGEM_X, y_atual, doc_texto)
-
-            desenha_titulo_secao("Observações"); desenha_paragrafo(dados.get('observacao', 'Nenhuma observação.'))
-            desenha_titulo_secao("Termo de Autorização de Imagem")
-            desenha_paragrafo("Autorizo, de forma gratuita, a utilização da minha imagem e voz para fins de divulgação institucional, conforme Lei de Direitos Autorais (Lei nº 9.610/1998).")
-            y_atual -= ESPACAMENTO_LINHA; c.setFont("Helvetica-Bold", 10); c.drawString(MARGEM_X, y_atual, f"[{'X' if dados.get('aceite_declaracao')=='Sim' else ' '}] LI E CONCORDO COM OS TERMOS")
-            
-            y_atual -= 3*cm; check_page_break()
-            c.line(largura/2 - 6*cm, y_atual, largura/2 + 6*cm, y_atual)
-            c.drawCentredString(largura/2, y_atual-0.4*cm, "Assinatura do Aluno ou Responsável")
-            
-            c.save()
-            messagebox.showinfo("PDF Gerado", f"O PDF da ficha foi salvo como:\n'{nome_arquivo}'")
-            if sys.platform == "win32": os.startfile(nome_arquivo)
-            else: subprocess.call(["open" if sys.platform == "darwin" else "xdg-open", nome_arquivo])
-        except Exception as e: messagebox.showerror("Erro ao Gerar PDF", f"Não foi possível criar o arquivo PDF.\nErro técnico: {e}")
+
+        def concluir(caminho):
+            messagebox.showinfo("PDF Gerado", f"O PDF da ficha foi salvo como:\n'{caminho}'")
+            abrir_arquivo(caminho)
+        def desenhar(salvar, *args):
+            self.tarefas.executar_paralelo(salvar, *args, ao_concluir=concluir,
+                                           ao_falhar=lambda e: messagebox.showerror("Erro ao Gerar PDF", f"Não foi possível criar o arquivo PDF.\nErro técnico: {e}"))
+        # Com --servidor a ficha é desenhada pelo serviço, e o posto não precisa do ReportLab. Aluno gravado e sem
+        # alterações no formulário: a ficha do cadastro, com a foto 3x4 que só o serviço tem
+        if self.servidor and self.codigo_carregado is not None and not self.campos_alterados(dados):
+            return desenhar(lambda codigo: self.acesso.salvar_ficha_aluno(self.conexao(), codigo), self.codigo_carregado)
+        if self.servidor: return desenhar(lambda dados: self.acesso.salvar_ficha(self.conexao(), dados), dados)
+        if self.codigo_carregado is None: return desenhar(salvar_ficha_do_formulario, dados)
+        # Aluno gravado: a ficha leva a foto 3x4 anexada, se houver
+        self.em_segundo_plano(anexos.foto_3x4, self.codigo_carregado, ao_concluir=lambda foto: desenhar(salvar_ficha_do_formulario, dados, self.pasta_anexos, foto))
+
+    def abrir_painel(self):
+        self.em_segundo_plano(self.acesso.painel if self.servidor else estatisticas.painel, ao_concluir=self.mostrar_painel)
+
+    def mostrar_painel(self, dados):
+        with instrumentacao.medir('tela: estatísticas'):
+            janela = tk.Toplevel(self); janela.title("Estatísticas de Inscrição"); janela.transient(self); janela.config(bg="#F0F0F0")
+            frame = ttk.Frame(janela, padding="10", style='Main.TFrame'); frame.pack(fill='both', expand=True)
+            resumo = f"Total de alunos: {dados['total']}     Recebem benefício: {dados['beneficio_gov']}     Desistências: {dados['desistencias']}"
+            ttk.Label(frame, text=resumo, font=('Helvetica', 10, 'bold')).grid(row=0, column=0, columnspan=3, sticky='w', pady=(0, 10))
+            for coluna, (titulo, chave) in enumerate((("Por Curso", 'por_curso'), ("Por Área", 'por_area'), ("Faixa Etária", 'faixas_etarias'))):
+                grupo = ttk.LabelFrame(frame, text=titulo, padding="5"); grupo.grid(row=1, column=coluna, sticky='nsew', padx=5)
+                tabela = ttk.Treeview(grupo, columns=('valor', 'total'), show='headings', height=8)
+                tabela.heading('valor', text=titulo.split()[-1]); tabela.heading('total', text='Alunos')
+                tabela.column('valor', width=180); tabela.column('total', width=70, anchor='center')
+                for valor, total in dados[chave]: tabela.insert("", "end", values=(valor, total))
+                tabela.pack(fill='both', expand=True)
+
+    def abrir_diagnostico(self):
+        # Tempos medidos neste posto (consultas, fichas, tela e, com --servidor, requisições); o log completo fica em diagnostico.log
+        janela = tk.Toplevel(self); janela.title("Diagnóstico de Desempenho"); janela.transient(self); janela.config(bg="#F0F0F0")
+        frame = ttk.Frame(janela, padding="10", style='Main.TFrame'); frame.pack(fill='both', expand=True)
+        frame.grid_columnconfigure(0, weight=1); frame.grid_rowconfigure(0, weight=1); frame.grid_rowconfigure(1, weight=1)
+        grupo = ttk.LabelFrame(frame, text="Tempos por operação (ms)", padding="5"); grupo.grid(row=0, column=0, columnspan=2, sticky='nsew')
+        colunas = ('operacao', 'quantidade', 'p50', 'p95', 'maximo'); tabela = ttk.Treeview(grupo, columns=colunas, show='headings', height=14)
+        for coluna, titulo, largura in zip(colunas, ("Operação", "Qtde", "p50", "p95", "Máx."), (520, 60, 80, 80, 80)):
+            tabela.heading(coluna, text=titulo); tabela.column(coluna, width=largura, anchor='w' if coluna == 'operacao' else 'e')
+        tabela.pack(fill='both', expand=True)
+        grupo = ttk.LabelFrame(frame, text=f"Consultas lentas (a partir de {instrumentacao.LIMITE_LENTA_MS} ms) e plano do SQLite", padding="5")
+        grupo.grid(row=1, column=0, columnspan=2, sticky='nsew', pady=5)
+        lentas = tk.Text(grupo, height=10, wrap='word', bg="#FFFFFF", fg="#333333", relief="solid", borderwidth=1); lentas.pack(fill='both', expand=True)
+
+        def atualizar():
+            for i in tabela.get_children(): tabela.delete(i)
+            for operacao, quantidade, p50, p95, maximo in instrumentacao.resumo():
+                tabela.insert("", "end", values=(instrumentacao.rotulo(operacao), quantidade, f"{p50:.1f}", f"{p95:.1f}", f"{maximo:.1f}"))
+            lentas.config(state='normal'); lentas.delete("1.0", tk.END)
+            for consulta in reversed(instrumentacao.consultas_lentas()):
+                lentas.insert(tk.END, f"{consulta['quando']}  {consulta['ms']:.1f} ms  {consulta['linhas']} linha(s)\n{consulta['sql'].strip()}\n")
+                lentas.insert(tk.END, ''.join(f"    {passo}\n" for passo in consulta['plano']) + "\n")
+            lentas.config(state='disabled')
+
+        def limpar():
+            instrumentacao.limpar(); atualizar()
+        ttk.Button(frame, text="Atualizar", command=atualizar).grid(row=2, column=0, sticky='e', padx=5)
+        ttk.Button(frame, text="Limpar", command=limpar).grid(row=2, column=1, sticky='w', padx=5)
+        atualizar()
+
+    def abrir_anexos(self):
+        if self.servidor: return messagebox.showinfo("Anexos", "Os documentos anexados ficam no computador do banco de dados; anexe-os por lá (python anexos.py).")
+        if self.codigo_carregado is None: return messagebox.showerror("Erro", "Carregue um aluno já salvo para ver ou anexar documentos.")
+        codigo, nome = self.codigo_carregado, self.widgets['nome_completo'].get()
+        janela = tk.Toplevel(self); janela.title(f"Documentos de {nome}"); janela.transient(self); janela.config(bg="#F0F0F0")
+        frame = ttk.Frame(janela, padding="10", style='Main.TFrame'); frame.pack(fill='both', expand=True)
+        frame.grid_columnconfigure(0, weight=1); frame.grid_rowconfigure(0, weight=1)
+        tabela = ttk.Treeview(frame, columns=('tipo', 'arquivo', 'data'), show='headings', height=10)
+        for coluna, titulo, largura in (('tipo', "Documento", 110), ('arquivo', "Arquivo", 260), ('data', "Anexado em", 140)):
+            tabela.heading(coluna, text=titulo); tabela.column(coluna, width=largura)
+        tabela.grid(row=0, column=0, columnspan=4, sticky='nsew')
+        # Miniatura do anexo selecionado, gerada sob demanda fora da thread do Tk
+        previa = ttk.Label(frame, text="Selecione um documento", width=22, anchor='center'); previa.grid(row=0, column=4, sticky='n', padx=(10, 0))
+        rotulos = {rotulo: tipo for tipo, rotulo in anexos.TIPOS.items()}
+        tipo = ttk.Combobox(frame, values=list(rotulos), state='readonly', width=14); tipo.set(anexos.TIPOS['doc_foto']); tipo.grid(row=1, column=0, sticky='w', pady=(10, 0))
+        lista = {}
+
+        def recarregar():
+            self.em_segundo_plano(anexos.listar_anexos, codigo, ao_concluir=mostrar)
+
+        def mostrar(anexos_aluno):
+            if not janela.winfo_exists(): return
+            lista.clear(); tabela.delete(*tabela.get_children())
+            for anexo in anexos_aluno:
+                lista[str(anexo['id'])] = anexo
+                tabela.insert("", "end", iid=str(anexo['id']), values=(anexos.TIPOS.get(anexo['tipo'], anexo['tipo']), anexo['nome_original'], anexo['data_envio'].replace('T', ' ')))
+
+        def selecionado():
+            selecao = tabela.selection()
+            return lista.get(selecao[0]) if selecao else None
+
+        def ao_selecionar(event):
+            anexo = selecionado()
+            if anexo is None: return
+            previa.config(image='', text="Carregando..."); previa.imagem = None
+            self.tarefas.executar_paralelo(anexos.miniatura, self.pasta_anexos, anexo, 'tela', ao_concluir=lambda caminho: exibir(anexo, caminho),
+                                           ao_falhar=lambda e: exibir(anexo, None))
+
+        def exibir(anexo, caminho):
+            if not janela.winfo_exists() or selecionado() is not anexo: return
+            previa.imagem = tk.PhotoImage(file=caminho) if caminho else None
+            previa.config(image=previa.imagem or '', text='' if caminho else "Sem miniatura\n(não é uma imagem)")
+
+        def adicionar():
+            arquivos = filedialog.askopenfilenames(parent=janela, title="Documentos digitalizados")
+            if not arquivos: return
+            tipo_escolhido = rotulos[tipo.get()]
+            def guardar():
+                # Cópia, hash e miniaturas fora da thread do Tk; só o registro na tabela passa pela thread do banco
+                guardados = [anexos.guardar_arquivo(self.pasta_anexos, origem) for origem in arquivos]; sem_miniatura = []
+                for anexo in guardados:
+                    # Imagem corrompida ou grande demais (OSError, DecompressionBombError) ou Pillow ausente:
+                    # o arquivo já está no depósito, então é registrado mesmo assim, só sem miniatura
+                    try: anexos.preparar_miniaturas(self.pasta_anexos, anexo)
+                    except Exception as e: sem_miniatura.append(f"{anexo['nome_original']} ({e})")
+                return guardados, sem_miniatura
+            def registrar(resultado):
+                guardados, sem_miniatura = resultado
+                self.em_segundo_plano(lambda conn: [anexos.registrar_anexo(conn, codigo, tipo_escolhido, anexo) for anexo in guardados], ao_concluir=lambda _: registrado(sem_miniatura))
+            def registrado(sem_miniatura):
+                recarregar()
+                if sem_miniatura: messagebox.showwarning("Sem Miniatura", "Anexado(s) sem miniatura:\n" + '\n'.join(sem_miniatura), parent=janela)
+                # Marca o documento como entregue no formulário; vai para o banco ao salvar o aluno
+                if codigo == self.codigo_carregado:
+                    self.widgets[tipo_escolhido].set(True)
+                    if tipo_escolhido == 'doc_foto': self.carregar_foto()
+            self.tarefas.executar_paralelo(guardar, ao_concluir=registrar,
+                                           ao_falhar=lambda e: messagebox.showerror("Erro ao Anexar", f"Não foi possível guardar o arquivo.\nErro técnico: {e}", parent=janela))
+
+        def abrir():
+            anexo = selecionado()
+            if anexo: abrir_arquivo(anexos.caminho_objeto(self.pasta_anexos, anexo))
+
+        def remover():
+            anexo = selecionado()
+            if anexo is None or not messagebox.askyesno("Remover Documento", f"Remover '{anexo['nome_original']}' dos documentos do aluno?", parent=janela): return
+            def removido(_):
+                recarregar()
+                if anexo['tipo'] == 'doc_foto': self.mostrar_foto(codigo, None); self.carregar_foto()
+            previa.config(image='', text=""); previa.imagem = None
+            self.em_segundo_plano(anexos.remover_anexo, self.pasta_anexos, anexo['id'], ao_concluir=removido)
+
+        tabela.bind('<<TreeviewSelect>>', ao_selecionar)
+        ttk.Button(frame, text="Anexar...", command=adicionar).grid(row=1, column=1, sticky='w', padx=5, pady=(10, 0))
+        ttk.Button(frame, text="Abrir", command=abrir).grid(row=1, column=2, sticky='w', padx=5, pady=(10, 0))
+        ttk.Button(frame, text="Remover", command=remover).grid(row=1, column=3, sticky='w', padx=5, pady=(10, 0))
+        recarregar()
+
+    def abrir_gerar_lote(self):
+        janela = tk.Toplevel(self); janela.title("Gerar Fichas em Lote"); janela.transient(self); janela.config(bg="#F0F0F0")
+        frame = ttk.Frame(janela, padding="10", style='Main.TFrame'); frame.pack(fill='both', expand=True)
+        frame.grid_columnconfigure(1, weight=1)
+        ttk.Label(frame, text="Curso (vazio = todos):").grid(row=0, column=0, sticky='w', padx=5, pady=2)
+        curso = ttk.Combobox(frame, values=[''] + list(self.widgets['curso']['values']), width=25); curso.grid(row=0, column=1, columnspan=2, sticky='we', padx=5, pady=2)
+        ttk.Label(frame, text="Inscrição de (dd/mm/aaaa):").grid(row=1, column=0, sticky='w', padx=5, pady=2)
+        data_inicio = ttk.Entry(frame, width=12); data_inicio.grid(row=1, column=1, sticky='w', padx=5, pady=2)
+        ttk.Label(frame, text="Até (dd/mm/aaaa):").grid(row=2, column=0, sticky='w', padx=5, pady=2)
+        data_fim = ttk.Entry(frame, width=12); data_fim.grid(row=2, column=1, sticky='w', padx=5, pady=2)
+        ttk.Label(frame, text="Pasta de saída:").grid(row=3, column=0, sticky='w', padx=5, pady=2)
+        pasta = ttk.Entry(frame, width=40); pasta.insert(0, os.path.abspath('fichas')); pasta.grid(row=3, column=1, sticky='we', padx=5, pady=2)
+        def escolher_pasta():
+            escolhida = filedialog.askdirectory(parent=janela, initialdir=pasta.get())
+            if escolhida: pasta.delete(0, tk.END); pasta.insert(0, escolhida)
+        ttk.Button(frame, text="...", width=3, command=escolher_pasta).grid(row=3, column=2, padx=5, pady=2)
+        mesclar = tk.BooleanVar(); ttk.Checkbutton(frame, text="Reunir todas as fichas num único PDF", variable=mesclar).grid(row=4, column=0, columnspan=3, sticky='w', padx=5, pady=2)
+        barra = ttk.Progressbar(frame, mode='determinate'); barra.grid(row=5, column=0, columnspan=3, sticky='we', padx=5, pady=(10, 2))
+        status = ttk.Label(frame, text=""); status.grid(row=6, column=0, columnspan=3, sticky='w', padx=5)
+
+        def iniciar():
+            filtros = curso.get().strip(), data_inicio.get().strip(), data_fim.get().strip()
+            try: [banco_dados.data_iso(data) for data in filtros[1:] if data]
+            except ValueError: return messagebox.showerror("Erro", "As datas devem estar no formato dd/mm/aaaa.", parent=janela)
+            botao_gerar.config(state='disabled')
+            self.em_segundo_plano(lambda conn: list(self.acesso.listar_alunos(conn, *filtros)), ao_concluir=gerar)
+
+        def gerar(registros):
+            if not registros:
+                botao_gerar.config(state='normal')
+                return messagebox.showwarning("Nenhum Aluno", "Nenhum aluno encontrado com os filtros informados.", parent=janela)
+            barra.config(maximum=len(registros), value=0)
+            pasta_saida = pasta.get().strip()
+            arquivo_mesclado = os.path.join(pasta_saida, "Fichas_Inscricao.pdf") if mesclar.get() else None
+
+            def progresso(feitos, total, caminho):
+                if janela.winfo_exists(): barra.config(value=feitos); status.config(text=f"{feitos} de {total} fichas")
+
+            def concluir(resultado):
+                caminhos, erros = resultado; botao_gerar.config(state='normal')
+                mensagem = f"{len(caminhos)} ficha(s) gerada(s) em:\n'{pasta_saida}'"
+                if arquivo_mesclado: mensagem += f"\n\nArquivo único: '{arquivo_mesclado}'"
+                if erros: mensagem += f"\n\n{len(erros)} ficha(s) com erro (códigos: {', '.join(str(codigo) for codigo, _ in erros)})."
+                messagebox.showinfo("Lote Concluído", mensagem, parent=janela)
+
+            def falhar(e):
+                botao_gerar.config(state='normal')
+                messagebox.showerror("Erro ao Gerar Lote", f"Não foi possível gerar as fichas.\nErro técnico: {e}", parent=janela)
+            # O lote (que usa o pool de processos) roda fora da thread do Tk; o progresso volta pela fila
+            self.tarefas.executar_paralelo(gerar_lote, registros, pasta_saida, None, arquivo_mesclado,
+                                           lambda *args: self.tarefas.notificar(progresso, *args), ao_concluir=concluir, ao_falhar=falhar)
+        botao_gerar = ttk.Button(frame, text="Gerar", command=iniciar); botao_gerar.grid(row=7, column=0, columnspan=3, pady=10)
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Sistema de Cadastro de Alunos")
+    parser.add_argument('--banco', help="arquivo do banco SQLite (padrão: variável CADASTROS_DB ou cadastros.db ao lado do programa)")
+    parser.add_argument('--otimizado', action='store_true', default=None, help="ativa WAL, synchronous=NORMAL, busy timeout, mmap e cache maior")
+    parser.add_argument('--servidor', metavar='URL', help="usa o serviço de cadastro (python servico.py) em vez de abrir o banco, ex.: http://127.0.0.1:8765")
+    parser.add_argument('--medir-inicio', action='store_true', help="mostra o tempo de importação, da primeira pintura e da carga da lista, e fecha")
+    parser.add_argument('--diagnostico', action='store_true', help="mede consultas, fichas e atualizações da tela (log diagnostico.log e botão Diagnóstico)")
+    args = parser.parse_args()
+    if args.diagnostico: instrumentacao.ativar()
     try:
-        app = AppCadastro()
+        app = AppCadastro(args.banco, args.otimizado, args.medir_inicio, args.servidor)
         app.mainloop()
     except Exception as e:
         messagebox.showerror("Erro Crítico", f"Ocorreu um erro fatal:\n\n{e}")
\ No newline at end of file
@@ -0,0 +1,252 @@
+# =============================================================================
+# SERVIÇO LOCAL DE CADASTRO (HTTP/JSON) PARA VÁRIOS POSTOS DE RECEPÇÃO
+# =============================================================================
+# Uso: python servico.py [--banco cadastros.db] [--endereco 127.0.0.1] [--porta 8765] [--conexoes 4]
+#
+# Um único processo abre o banco e atende os postos, que rodam o programa com
+#   python programa_cadastro.py --servidor http://<máquina do serviço>:8765
+# Os códigos dos alunos novos são gerados aqui, na mesma transação que grava o cadastro.
+# Como só este processo toca no arquivo, o modo WAL fica ligado por padrão (ver banco_dados.ajustar_desempenho).
+# Não há autenticação: use --endereco 0.0.0.0 apenas numa rede interna confiável.
+#
+#   GET  /alunos?nome=&codigo=&limite=      página da lista (após a chave nome, codigo)
+#   GET  /alunos/pesquisa?texto=&limite=    pesquisa por nome, CPF, curso ou código
+#   GET  /alunos/filtro?curso=&area=&de=&ate=   cadastros completos, um JSON por linha
+#   GET  /alunos/<codigo>                   cadastro completo
+#   GET  /alunos/<codigo>/ficha             PDF da ficha do cadastro gravado (com a foto 3x4 anexada, se houver)
+#   POST /alunos                            aluno novo (o código é gerado pelo serviço)
+#   PUT  /alunos/<codigo>                   {..., "versao": n}: regrava o cadastro inteiro, se ainda na versão n
+#   PATCH /alunos/<codigo>                  {"versao": n, "alteracoes": {...}}: só os campos alterados, se o
+#                                           cadastro ainda estiver na versão n (PUT e PATCH: senão 409 com versao_atual)
+#   POST /fichas                            PDF da ficha dos dados enviados (ainda não gravados)
+#   GET  /proximo-codigo                    código provável do próximo aluno (apenas para exibir)
+#   GET  /estatisticas                      números do painel de estatísticas
+#   GET  /diagnostico                       p50/p95 por rota e consulta e as consultas lentas (com --diagnostico)
+import argparse
+import json
+import queue
+import re
+import sqlite3
+import sys
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, quote, urlsplit
+
+import anexos
+import banco_dados
+import estatisticas
+import instrumentacao
+
+PORTA_PADRAO = 8765
+# Conexões abertas com o banco; requisições além disso esperam uma conexão livre
+CONEXOES_PADRAO = 4
+
+class ErroRequisicao(Exception):
+    def __init__(self, status, mensagem, **extras):
+        super().__init__(mensagem); self.status = status; self.extras = extras
+
+class PoolConexoes:
+    """Conexões SQLite reaproveitadas entre as requisições (cada uma usada por uma thread de cada vez)."""
+
+    def __init__(self, caminho=None, tamanho=CONEXOES_PADRAO, otimizado=True):
+        self.livres = queue.Queue()
+        for _ in range(tamanho): self.livres.put(banco_dados.conectar(caminho, otimizado, check_same_thread=False))
+
+    @contextmanager
+    def conexao(self):
+        conn = self.livres.get()
+        try: yield conn
+        finally:
+            if conn.in_transaction: conn.rollback()
+            self.livres.put(conn)
+
+    def fechar(self):
+        while not self.livres.empty(): self.livres.get_nowait().close()
+
+def inteiro(consulta, nome, padrao=None):
+    try: return int(consulta[nome][0]) if nome in consulta else padrao
+    except ValueError: raise ErroRequisicao(400, f"Parâmetro '{nome}' deve ser um número.")
+
+def texto(consulta, nome):
+    return consulta.get(nome, [''])[0].strip() or None
+
+def dados_validados(corpo):
+    erro = banco_dados.validar_cadastro(corpo)
+    if erro: raise ErroRequisicao(400, erro)
+    return banco_dados.para_banco(corpo)
+
+def gravar(pool, dados):
+    with pool.conexao() as conn: codigo, outro_aluno = banco_dados.gravar_cadastro(conn, dados)
+    if outro_aluno is not None:
+        raise ErroRequisicao(409, f"O CPF '{dados.get('cpf')}' já está cadastrado para o aluno com código {outro_aluno}.", codigo=outro_aluno)
+    return codigo
+
+def alterar(pool, codigo, versao, alteracoes):
+    if not isinstance(versao, int): raise ErroRequisicao(400, "Envie a versão carregada do cadastro ('versao').")
+    with pool.conexao() as conn: nova_versao, outro_aluno = banco_dados.alterar_cadastro(conn, codigo, versao, alteracoes)
+    if outro_aluno is not None:
+        raise ErroRequisicao(409, f"O CPF '{alteracoes['cpf']}' já está cadastrado para o aluno com código {outro_aluno}.", codigo=outro_aluno)
+    return {'codigo': codigo, 'versao': nova_versao}
+
+def renderizar(dados, foto=None):
+    import ficha_pdf
+    return ficha_pdf.nome_arquivo_ficha(dados), ficha_pdf.renderizar_ficha(dados, foto)
+
+# Cada rota recebe (pool, grupos da URL, parâmetros da consulta, corpo JSON) e devolve o objeto da
+# resposta, ou (nome do arquivo, bytes) para PDFs, ou um gerador de linhas JSON
+def rota_pagina(pool, grupos, consulta, corpo):
+    apos = (texto(consulta, 'nome') or '', inteiro(consulta, 'codigo')) if 'codigo' in consulta else None
+    with pool.conexao() as conn: return banco_dados.pagina_alunos(conn, apos, inteiro(consulta, 'limite', 200))
+
+def rota_pesquisa(pool, grupos, consulta, corpo):
+    with pool.conexao() as conn: return banco_dados.pesquisar_alunos(conn, texto(consulta, 'texto') or '', inteiro(consulta, 'limite', 200))
+
+def rota_filtro(pool, grupos, consulta, corpo):
+    filtros = texto(consulta, 'curso'), texto(consulta, 'de'), texto(consulta, 'ate'), texto(consulta, 'area')
+    try: [banco_dados.data_iso(data) for data in filtros[1:3] if data]
+    except ValueError: raise ErroRequisicao(400, "As datas devem estar no formato dd/mm/aaaa.")
+    def linhas():
+        # A conexão fica reservada enquanto as linhas são enviadas
+        with pool.conexao() as conn:
+            for dados in banco_dados.listar_alunos(conn, *filtros): yield dados
+    return linhas()
+
+def rota_aluno(pool, grupos, consulta, corpo):
+    with pool.conexao() as conn: dados = banco_dados.buscar_aluno(conn, int(grupos[0]))
+    if dados is None: raise ErroRequisicao(404, f"Nenhum aluno encontrado com o código {grupos[0]}.")
+    return dados
+
+def rota_ficha_aluno(pool, grupos, consulta, corpo):
+    dados = rota_aluno(pool, grupos, consulta, corpo)
+    with pool.conexao() as conn: foto, pasta = anexos.foto_3x4(conn, dados['codigo']), anexos.pasta_anexos(conn)
+    return renderizar(dados, anexos.miniatura_da_ficha(pasta, foto))
+
+def rota_criar(pool, grupos, consulta, corpo):
+    dados = dados_validados(corpo); dados.pop('codigo', None)
+    return {'codigo': gravar(pool, dados)}
+
+def rota_alterar(pool, grupos, consulta, corpo):
+    # Cadastro inteiro: as colunas ausentes no corpo ficam vazias, como em gravar_cadastro
+    dados = dados_validados(corpo)
+    return alterar(pool, int(grupos[0]), corpo.get('versao'), {col: dados.get(col) for col in banco_dados.COLUNAS if col != 'codigo'})
+
+def rota_alterar_campos(pool, grupos, consulta, corpo):
+    versao, alteracoes = corpo.get('versao'), corpo.get('alteracoes')
+    if not isinstance(versao, int) or not isinstance(alteracoes, dict):
+        raise ErroRequisicao(400, "Envie a versão carregada ('versao') e os campos alterados ('alteracoes').")
+    erro = banco_dados.validar_alteracoes(alteracoes)
+    if erro: raise ErroRequisicao(400, erro)
+    return alterar(pool, int(grupos[0]), versao, banco_dados.para_banco(alteracoes))
+
+def rota_ficha(pool, grupos, consulta, corpo):
+    return renderizar(corpo)
+
+def rota_proximo_codigo(pool, grupos, consulta, corpo):
+    with pool.conexao() as conn: return {'codigo': banco_dados.proximo_codigo(conn)}
+
+def rota_estatisticas(pool, grupos, consulta, corpo):
+    with pool.conexao() as conn: return estatisticas.painel(conn)
+
+def rota_diagnostico(pool, grupos, consulta, corpo):
+    if not instrumentacao.ATIVO: raise ErroRequisicao(404, "Diagnóstico desligado: inicie o serviço com --diagnostico.")
+    return {'operacoes': [dict(zip(('operacao', 'quantidade', 'p50_ms', 'p95_ms', 'maximo_ms'), (instrumentacao.rotulo(linha[0]),) + linha[1:]))
+                          for linha in instrumentacao.resumo()],
+            'consultas_lentas': instrumentacao.consultas_lentas()}
+
+ROTAS = [
+    ('GET', r'/alunos', rota_pagina),
+    ('GET', r'/alunos/pesquisa', rota_pesquisa),
+    ('GET', r'/alunos/filtro', rota_filtro),
+    ('GET', r'/alunos/(\d+)', rota_aluno),
+    ('GET', r'/alunos/(\d+)/ficha', rota_ficha_aluno),
+    ('POST', r'/alunos', rota_criar),
+    ('PUT', r'/alunos/(\d+)', rota_alterar),
+    ('PATCH', r'/alunos/(\d+)', rota_alterar_campos),
+    ('POST', r'/fichas', rota_ficha),
+    ('GET', r'/proximo-codigo', rota_proximo_codigo),
+    ('GET', r'/estatisticas', rota_estatisticas),
+    ('GET', r'/diagnostico', rota_diagnostico),
+]
+
+class ManipuladorCadastro(BaseHTTPRequestHandler):
+    server_version = "ServicoCadastro/1.0"
+
+    def do_GET(self): self.atender('GET')
+    def do_POST(self): self.atender('POST')
+    def do_PUT(self): self.atender('PUT')
+    def do_PATCH(self): self.atender('PATCH')
+
+    def atender(self, metodo):
+        endereco = urlsplit(self.path); consulta = parse_qs(endereco.query)
+        try:
+            for metodo_rota, padrao, funcao in ROTAS:
+                encontrado = re.fullmatch(padrao, endereco.path.rstrip('/') or '/')
+                if metodo_rota == metodo and encontrado: break
+            else: raise ErroRequisicao(404, f"Rota não encontrada: {metodo} {endereco.path}")
+            corpo = self.ler_corpo() if metodo in ('POST', 'PUT', 'PATCH') else None
+            with instrumentacao.medir(f"rota: {metodo} {padrao}"): resposta = funcao(self.server.pool, encontrado.groups(), consulta, corpo)
+        except ErroRequisicao as e: return self.responder_json(e.status, {'erro': str(e), **e.extras})
+        except banco_dados.CadastroAlterado as e: return self.responder_json(409, {'erro': str(e), 'versao_atual': e.versao_atual})
+        except sqlite3.IntegrityError as e: return self.responder_json(409, {'erro': f"Cadastro em conflito com outro já gravado: {e}"})
+        except sqlite3.OperationalError as e: return self.responder_json(503, {'erro': f"Banco de dados ocupado ou indisponível: {e}"})
+        except Exception as e:
+            self.log_error("Erro em %s %s: %r", metodo, self.path, e)
+            return self.responder_json(500, {'erro': f"Erro interno do serviço: {e}"})
+        if isinstance(resposta, tuple) and isinstance(resposta[1], bytes): self.responder_pdf(*resposta)
+        elif hasattr(resposta, '__next__'): self.responder_linhas(resposta)
+        else: self.responder_json(201 if metodo == 'POST' and funcao is rota_criar else 200, resposta)
+
+    def ler_corpo(self):
+        try: return json.loads(self.rfile.read(int(self.headers.get('Content-Length') or 0)) or b'{}')
+        except ValueError: raise ErroRequisicao(400, "O corpo da requisição deve ser um objeto JSON.")
+
+    def responder_json(self, status, objeto):
+        conteudo = json.dumps(objeto, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8'); self.send_header('Content-Length', str(len(conteudo)))
+        self.end_headers(); self.wfile.write(conteudo)
+
+    def responder_pdf(self, nome_arquivo, pdf):
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/pdf'); self.send_header('Content-Length', str(len(pdf)))
+        self.send_header('Content-Disposition', f"attachment; filename*=UTF-8''{quote(nome_arquivo)}")
+        self.end_headers(); self.wfile.write(pdf)
+
+    def responder_linhas(self, linhas):
+        # Sem Content-Length: o fim da resposta é o fechamento da conexão (HTTP/1.0)
+        self.send_response(200); self.send_header('Content-Type', 'application/x-ndjson; charset=utf-8'); self.end_headers()
+        for dados in linhas: self.wfile.write(json.dumps(dados, ensure_ascii=False).encode('utf-8') + b'\n')
+
+    def log_message(self, formato, *args):
+        if self.server.detalhado: super().log_message(formato, *args)
+
+def criar_servidor(caminho=None, endereco='127.0.0.1', porta=PORTA_PADRAO, conexoes=CONEXOES_PADRAO, otimizado=True, detalhado=False):
+    servidor = ThreadingHTTPServer((endereco, porta), ManipuladorCadastro)
+    servidor.daemon_threads = True; servidor.detalhado = detalhado
+    servidor.pool = PoolConexoes(caminho, conexoes, otimizado)
+    return servidor
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serviço HTTP local que atende os postos de cadastro de alunos.")
+    parser.add_argument('--banco', help="arquivo do banco SQLite")
+    parser.add_argument('--endereco', default='127.0.0.1', help="endereço de escuta (0.0.0.0 para aceitar outros computadores)")
+    parser.add_argument('--porta', type=int, default=PORTA_PADRAO, help="porta TCP (0 = escolhe uma livre)")
+    parser.add_argument('--conexoes', type=int, default=CONEXOES_PADRAO, help="conexões abertas com o banco")
+    parser.add_argument('--sem-wal', dest='otimizado', action='store_false', help="não liga o modo ajustado (WAL) do banco")
+    parser.add_argument('--detalhado', action='store_true', help="registra cada requisição no terminal")
+    parser.add_argument('--diagnostico', action='store_true', help="mede rotas e consultas (log diagnostico.log e GET /diagnostico)")
+    args = parser.parse_args(argv)
+
+    # Antes de abrir as conexões do pool, para que elas já sejam instrumentadas
+    if args.diagnostico: instrumentacao.ativar()
+
+    servidor = criar_servidor(args.banco, args.endereco, args.porta, args.conexoes, args.otimizado, args.detalhado)
+    endereco, porta = servidor.server_address[:2]
+    print(f"Serviço de cadastro em http://{endereco}:{porta}", flush=True)
+    try: servidor.serve_forever()
+    except KeyboardInterrupt: pass
+    finally: servidor.server_close(); servidor.pool.fechar()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
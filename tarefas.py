@@ -0,0 +1,61 @@
+# =============================================================================
+# EXECUÇÃO DE TAREFAS FORA DA THREAD DA INTERFACE TK
+# =============================================================================
+import queue
+from concurrent.futures import ThreadPoolExecutor
+
+class ExecutorTarefas:
+    """Roda funções em threads de trabalho e aplica os resultados na thread do Tk.
+
+    As tarefas de 'executar' usam uma única thread, na ordem em que foram pedidas, e por isso
+    podem compartilhar a mesma conexão SQLite. 'executar_paralelo' é para trabalho que não usa
+    o banco (PDFs, lotes). Os retornos passam por uma fila lida com after(), pois o Tk só pode
+    ser tocado pela thread principal.
+    """
+
+    def __init__(self, raiz, indicador=None, intervalo_ms=50):
+        self.raiz = raiz; self.indicador = indicador; self.intervalo_ms = intervalo_ms
+        self.fila = queue.Queue(); self.pendentes = 0; self.futuros_banco = set()
+        self.executor_banco = ThreadPoolExecutor(max_workers=1, thread_name_prefix='banco')
+        self.executor_paralelo = ThreadPoolExecutor(max_workers=2, thread_name_prefix='paralelo')
+        self.verificacao = self.raiz.after(self.intervalo_ms, self.processar_fila)
+
+    def executar(self, funcao, *args, ao_concluir=None, ao_falhar=None):
+        self._enviar(self.executor_banco, funcao, args, ao_concluir, ao_falhar)
+
+    def executar_paralelo(self, funcao, *args, ao_concluir=None, ao_falhar=None):
+        self._enviar(self.executor_paralelo, funcao, args, ao_concluir, ao_falhar)
+
+    def notificar(self, funcao, *args):
+        # Pode ser chamada de qualquer thread: agenda 'funcao(*args)' na thread do Tk
+        self.fila.put((funcao, args, False))
+
+    def _enviar(self, executor, funcao, args, ao_concluir, ao_falhar):
+        self.pendentes += 1
+        if self.indicador and self.pendentes == 1: self.indicador(True)
+        def tarefa():
+            try: resultado = funcao(*args)
+            except Exception as e: self.fila.put((ao_falhar, (e,), True))
+            else: self.fila.put((ao_concluir, (resultado,), True))
+        futuro = executor.submit(tarefa)
+        if executor is self.executor_banco: self.futuros_banco.add(futuro); futuro.add_done_callback(self.futuros_banco.discard)
+
+    def processar_fila(self):
+        try:
+            while True:
+                callback, args, encerra_tarefa = self.fila.get_nowait()
+                if encerra_tarefa:
+                    self.pendentes -= 1
+                    if self.indicador and self.pendentes == 0: self.indicador(False)
+                if callback: callback(*args)
+        except queue.Empty: pass
+        finally: self.verificacao = self.raiz.after(self.intervalo_ms, self.processar_fila)
+
+    def encerrar(self, finalizar_banco=None):
+        # Não espera: o que ainda não começou é cancelado, e 'finalizar_banco' (ex.: fechar a conexão) roda na
+        # thread de banco logo depois da tarefa em andamento (um lote ou importação), que não pode ser interrompida
+        self.raiz.after_cancel(self.verificacao)
+        self.executor_paralelo.shutdown(wait=False, cancel_futures=True)
+        for futuro in list(self.futuros_banco): futuro.cancel()
+        if finalizar_banco: self.executor_banco.submit(finalizar_banco)
+        self.executor_banco.shutdown(wait=False)